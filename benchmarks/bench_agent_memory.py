@@ -0,0 +1,64 @@
+"""
+Benchmark the memory held per agent.
+
+A population of initial agents is created with tracemalloc running, and the
+memory still allocated afterwards is reported per agent: this is the agent
+objects and everything they refer to. The columns of the PopulationStore are
+allocated up front for pop_size rows, before tracing starts, so their size
+per agent is reported separately, along with the total of the two.
+"""
+from __future__ import division
+import os
+import sys
+import tracemalloc
+
+import click
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from intergen.agent import Female
+from intergen.agent_factory import AgentFactory
+from intergen.statistics_collector import VoidStatisticsCollector
+from intergen.timestepper import TimeStepper
+from intergen.utils import DEFAULT_PARAMS_FILE
+
+
+def measure(pop_size, fertility_type):
+    with open(DEFAULT_PARAMS_FILE) as f:
+        params = yaml.safe_load(f)
+    params["pop_size"] = pop_size
+    if fertility_type:
+        params["fertility_type"] = fertility_type
+    timestepper = TimeStepper(params)
+    factory = AgentFactory(params, timestepper, VoidStatisticsCollector())
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    agents = [factory.make_initial_agent() for _ in range(pop_size)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n_female = sum(isinstance(agent, Female) for agent in agents)
+    store = factory.store
+    store_bytes = sum(getattr(store, name).nbytes for name, _ in store.columns)
+    return (end - start) / pop_size, store_bytes / store.size, n_female
+
+
+@click.command()
+@click.option("--sizes", default="10000,50000",
+              help="Comma separated population sizes to benchmark")
+@click.option("--fertility-type", default=None,
+              help="Override the fertility_type parameter")
+def run_benchmark(sizes, fertility_type):
+    print("{:>10} {:>10} {:>14} {:>14} {:>14}".format(
+        "N", "female", "object B/agent", "store B/agent", "total B/agent"))
+    for pop_size in [int(size) for size in sizes.split(",")]:
+        per_agent, store_per_agent, n_female = measure(pop_size,
+                                                       fertility_type)
+        print("{:>10} {:>10} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+            pop_size, n_female, per_agent, store_per_agent,
+            per_agent + store_per_agent))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,69 @@
+"""
+Benchmark the cost of removing the agents that die in a timestep.
+
+For a range of population sizes, a fixed proportion of agents is killed and
+removed with Population.remove_dead. The time taken per agent should stay
+roughly constant as the population grows (i.e. total cost linear in N). For
+comparison the same deaths are also removed with one list.remove per death,
+as was previously done, which grows with deaths x N.
+"""
+from __future__ import division
+import os
+import sys
+import time
+import random as rnd
+
+import click
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from intergen.agent_factory import AgentFactory
+from intergen.population import Population
+from intergen.statistics_collector import VoidStatisticsCollector
+from intergen.timestepper import TimeStepper
+from intergen.utils import DEFAULT_PARAMS_FILE
+
+
+def make_population(pop_size):
+    with open(DEFAULT_PARAMS_FILE) as f:
+        params = yaml.safe_load(f)
+    params["pop_size"] = pop_size
+    timestepper = TimeStepper(params)
+    factory = AgentFactory(params, timestepper, VoidStatisticsCollector())
+    return Population(params, None, factory)
+
+
+def time_compaction(pop, deaths):
+    start = time.time()
+    pop.remove_dead(deaths)
+    return time.time() - start
+
+
+def time_list_remove(poplist, deaths):
+    start = time.time()
+    for agent in deaths:
+        poplist.remove(agent)
+    return time.time() - start
+
+
+@click.command()
+@click.option("--sizes", default="10000,20000,40000,80000",
+              help="Comma separated population sizes to benchmark")
+@click.option("--death-rate", default=0.01,
+              help="Proportion of the population dying in the timestep")
+def run_benchmark(sizes, death_rate):
+    print("{:>10} {:>8} {:>14} {:>16} {:>14}".format(
+        "N", "deaths", "compaction(s)", "per agent (us)", "list.remove(s)"))
+    for pop_size in [int(size) for size in sizes.split(",")]:
+        pop = make_population(pop_size)
+        deaths = rnd.sample(pop.poplist, int(death_rate * pop_size))
+        legacy = time_list_remove(list(pop.poplist), deaths)
+        compaction = time_compaction(pop, deaths)
+        print("{:>10} {:>8} {:>14.4f} {:>16.3f} {:>14.4f}".format(
+            pop_size, len(deaths), compaction,
+            1e6 * compaction / pop_size, legacy))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,70 @@
+"""
+Benchmark the growth of memory over a long simulation.
+
+A simulation is run for a number of years, and at intervals the memory
+allocated is reported alongside the number of living agents, the number of
+dead agents held in the archive, and the number of Agent objects still
+reachable. Agent objects should follow the living population, with the dead
+costing only their archive row (reported in bytes per dead agent).
+Traced memory also includes the statistics collected so far.
+"""
+from __future__ import division
+import gc
+import os
+import sys
+import tracemalloc
+
+import click
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from intergen.agent import Agent
+from intergen.simulation import Simulation
+from intergen.statistics_collector import StatisticsCollector
+from intergen.utils import DEFAULT_PARAMS_FILE, DEFAULT_STATS_FILE
+
+
+def archive_bytes(store):
+    """
+    Memory held by the columns and ident index of a store
+    """
+    return (sum(getattr(store, name).nbytes for name, _ in store.columns) +
+            store.row_of.nbytes)
+
+
+@click.command()
+@click.option("--pop-size", default=2000, help="Initial population size")
+@click.option("--years", default=350, help="Number of years to simulate")
+@click.option("--interval", default=50,
+              help="Number of years between reports")
+@click.option("--seed", default=1)
+def run_benchmark(pop_size, years, interval, seed):
+    with open(DEFAULT_PARAMS_FILE) as f:
+        params = yaml.safe_load(f)
+    with open(DEFAULT_STATS_FILE) as f:
+        stats = StatisticsCollector(yaml.safe_load(f))
+    params["pop_size"] = pop_size
+
+    tracemalloc.start()
+    sim = Simulation(params, stats, seed=seed)
+    start_year = sim.timestepper.date.year
+    print("{:>6} {:>8} {:>8} {:>8} {:>12} {:>10}".format(
+        "year", "living", "dead", "objects", "traced (kB)", "B/dead"))
+    report_year = start_year
+    while report_year < start_year + years:
+        report_year += interval
+        while sim.timestepper.date.year < report_year:
+            sim.time_step()
+        gc.collect()
+        objects = sum(isinstance(obj, Agent) for obj in gc.get_objects())
+        traced, _ = tracemalloc.get_traced_memory()
+        dead = sim.pop.dead_store
+        print("{:>6} {:>8} {:>8} {:>8} {:>12} {:>10.1f}".format(
+            report_year, sim.pop.pop_size, len(dead), objects,
+            traced // 1024, archive_bytes(dead) / max(len(dead), 1)))
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -2,6 +2,11 @@ __author__ = "Jason Hilton"
 
 __all__ = ["agent",
            "population",
+           "population_store",
+           "birth_counts",
+           "hazard_tables",
+           "context",
+           "genealogy",
            "fertility",
            "simulation",
            "control",
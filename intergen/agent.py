@@ -8,100 +8,162 @@ from __future__ import division
 import random as rnd
 from math import exp
 import logging
-import datetime
 
 
-from .utils import calculate_age_years, gompertz_mortality_fact
+from .utils import age_years_from_ordinal
 from .fertility import get_fertility
 from .employment import Employment
+from .population_store import StoreView, column_property, MISSING
 
 
 logger = logging.getLogger("intergen")
 
 
-class Agent(object):
+class Agent(StoreView):
     """
     Genderless agent class
     contains methods and attributes shared by male and female agents
-    """
-    __slots__ = ["params", "stats", "timestepper", "partner", "mother",
-                 "age_years", "DOB", "age", "marriage_market",
-                 "age_at_marriage", "employment", "in_marriage_market",
-                 "gp_start", "gompertz", "experience", "skill", "aspiration",
-                 "ident","imprinted"]
 
-    def __init__(self, params, attributes, timestepper, stats):
+    Agents are views onto a row of a PopulationStore; the attributes defined
+    with column_property below live in the store's columns.
+    Dates (DOB) are held as integer day ordinals, and experience in days.
+    References shared by all agents (params, stats, timestepper, hazards)
+    are reached through a single SimulationContext.
+    Kinship is held as idents (partner_id, mother_id etc.) and followed
+    through the context's Genealogy; partner and mother return living agents.
+    """
+    __slots__ = ["context", "age_at_marriage", "employment"]
+
+    ident = column_property("ident")
+    DOB = column_property("DOB")
+    age_years = column_property("age_years")
+    experience = column_property("experience")
+    skill = column_property("skill")
+    aspiration = column_property("aspiration")
+    partner_id = column_property("partner_id")
+    mother_id = column_property("mother_id")
+    household_id = column_property("household_id")
+    youngest_child_id = column_property("youngest_child_id")
+    elder_sibling_id = column_property("elder_sibling_id")
+    job_id = column_property("job_id")
+    imprinted = column_property("imprinted")
+    in_marriage_market = column_property("in_marriage_market")
+
+    def __init__(self, attributes, context, store):
 
         """
-        Initialise agent using params and attributes
+        Initialise agent using attributes, within the simulation context
         """
-        self.params = params
-        self.stats = stats
+        self.context = context
+        self.attach(store)
+        self._store.female[self._row] = self.isfemale
 
         #for key, value in attributes.items():
         #    self.__setattr__(key, value)
-        self.age = attributes["age"]
         self.DOB = attributes["DOB"]
         self.ident = attributes["ident"]
+        store.index_ident(self._row)
+        self.household_id = self.ident
         self.aspiration = attributes["aspiration"]
         self.experience = attributes["experience"]
         self.skill = attributes["skill"]
 
-
-        self.timestepper = timestepper
-
-        self.age_years = calculate_age_years(self.DOB, timestepper.date)
-
-        self.partner = None
-        self.mother = None
+        # thereafter updated for all agents at once by Population.update_ages
+        self.age_years = age_years_from_ordinal(self.DOB,
+                                                context.timestepper.date)
 
         self.imprinted = False
 
-        self.marriage_market = None
         self.age_at_marriage = None
         self.in_marriage_market = False
 
-        self.employment = Employment(self, params)
-
-        # could we include these as static variables that are changed
-        # by 'simulation'
-        # maybe we would want to include heterogeneity.
-        a = self.params["gompertz_a"]
-        b = self.params["gompertz_b"]
-        l = self.params["gompertz_l"]
-        self.gp_start = self.params["gompertz_start"]
-        self.gompertz = gompertz_mortality_fact(a, b, l,
-                                                self.gp_start)
+        self.employment = Employment(self)
+        self.update_status_counts()
 
         logger.debug("event:initialisation,date:{},agent:{},age:{},experience:{}".format(
-                                timestepper.date,self.ident, self.age_years, self.experience))
+                                self.timestepper.date,self.ident, self.age_years, self.experience))
 
     
 
+    # shared references -----------------------------------------------
+
+    @property
+    def params(self):
+        return self.context.params
+
+    @property
+    def stats(self):
+        return self.context.stats
+
+    @property
+    def timestepper(self):
+        return self.context.timestepper
+
+    @property
+    def hazards(self):
+        return self.context.hazards
+
+    @property
+    def genealogy(self):
+        return self.context.genealogy
+
+    @property
+    def jobseekers(self):
+        return self.context.jobseekers
+
+    # columnar attributes ---------------------------------------------
+
+    @property
+    def age(self):
+        """
+        age in days
+        """
+        return self.timestepper.ordinal - self.DOB
+
+    @property
+    def partner(self):
+        """
+        The living partner, or None (see have_partner)
+        """
+        return self.genealogy.live_agent(self.partner_id)
+
+    @partner.setter
+    def partner(self, partner):
+        self.partner_id = MISSING if partner is None else partner.ident
+        self.update_status_counts()
+
+    @property
+    def mother(self):
+        """
+        The living mother, or None
+        """
+        return self.genealogy.live_agent(self.mother_id)
+
+    @mother.setter
+    def mother(self, mother):
+        self.mother_id = MISSING if mother is None else mother.ident
+
     # timestep functions ----------------------------------------------
 
     def step_activity(self, sim):
         """
         main method for doing stuff that an agent does every year
         to be extended by child methods
+        Transitions that come with ageing are applied separately, for all
+        agents at once, by Population.lifecycle_stage
         """
-        self.age_on(sim.pop)
+        pass
 
     def age_on(self, pop):
         """
-        increase agent age
+        act on the consequences of growing older.
+        age_years and experience have already been updated for everyone by
+        Population.update_ages
+        Per-agent reference version of Population.lifecycle_stage
         """
-        timestep_length = self.timestepper.get_timestep_length()
-        self.age += timestep_length
-        self.age_years = calculate_age_years(self.DOB, self.timestepper.date)
-
-
         if self.age_years >= self.params["imprinting_time"] and not self.imprinted:
             self.aspiration = self.determine_aspiration(pop)
 
-        if self.employment.job:
-            self.experience += timestep_length
-
         if self.age_years >= self.params["retirement_age"] and self.employment.have_job():
             self.employment.job.retire()
 
@@ -118,15 +180,19 @@ class Agent(object):
         determine a threshold for satisfaction with life
         """
         if self.age_years > self.params["imprinting_time"] and self.aspiration:
+            # already past imprinting age (members of initial population)
+            self.imprinted = True
             return self.aspiration
-        try:
-            aspiration = self.mother.partner.employment.get_wage(pop)
+        # the father is the mother's partner, who may have died
+        father_id = self.genealogy.value("partner_id", self.mother_id)
+        if father_id != MISSING:
+            aspiration = self.genealogy.wage_of(father_id, pop)
             self.imprinted = True
             logger.debug("event:aspiration_imprinted,date:{},agent:{},aspiration:{}"
                           "".format(self.timestepper.date,
                                     self.ident,
                                     aspiration))
-        except AttributeError:
+        else:
             aspiration = self.params["social_security_level"]
             self.imprinted = True
             logger.debug("event:aspiration_imputed,date:{},agent:{},"
@@ -153,26 +219,34 @@ class Agent(object):
     # nuptiality functions ----------------------------------------------
 
     def have_partner(self):
-        return self.partner is not None
+        # a widowed agent keeps the ident of their late partner
+        return self.partner_id != MISSING
+
+    def partner_wage(self, pop):
+        """
+        The wage of the partner (the benefit level if they have died)
+        """
+        return self.genealogy.wage_of(self.partner_id, pop)
+
+    def partner_value(self, name):
+        """
+        The value of column name for the partner, living or dead
+        """
+        return self.genealogy.value(name, self.partner_id)
 
 
     def find_partner(self, pop):
         """
         find a partner
+        Per-agent reference version of Population.partnering_stage
         """
-        if self.in_marriage_market:
+        max_age = self.params["marriage_market_max_age"]
+        if self.in_marriage_market or (max_age is not None and
+                                       self.age_years > max_age):
             return
-        a = self.params["partnering_a"]
-        alpha = self.params["partnering_alpha"]
-        mu = self.params["partnering_mu"]
-        # avoid using the keyword lambda
-        lambda_p = self.params["partnering_lambda"]
-        # correct for timestep length
-        mult = self.timestepper.get_timestep_days() / self.params["year_length"]
-        if rnd.random() < mult * a * exp(-alpha * (self.age_years - mu) -
-                                         exp(- lambda_p * (self.age_years - mu))):
-            self.marriage_market = self.get_marriage_market(pop)
-            self.marriage_market.append(self)
+        hazard = self.hazards.at(self.hazards.partnering_step, self.age_years)
+        if rnd.random() < hazard:
+            self.get_marriage_market(pop).append(self)
             self.in_marriage_market = True
 
     # network functions --------------------------------------
@@ -187,26 +261,33 @@ class Agent(object):
         """
         Check to see if I survive the timestep
         Return self so that I can be removed from various lists
+        Reference implementation: during simulation mortality is determined
+        for everyone at once by Population.mortality_stage
         """
-        if self.age_years <= self.gp_start:
+        if self.age_years <= self.params["gompertz_start"]:
             return
         mort_rn = rnd.random()
-        mult = self.timestepper.get_timestep_length().days / self.params["year_length"]
-        if mort_rn < self.gompertz(self.age_years) * mult:
+        if mort_rn < self.hazards.at(self.hazards.mortality_step,
+                                     self.age_years):
             return self
 
     def die(self, pop):
         """
         remove agent from simulation
-        keep this method in agent in order to remove family pointers
+        The agent's row is moved to the archive of the dead, which keeps
+        only kinship and fertility history, so the job is released first.
+        The population is responsible for compacting poplist afterwards
+        (see Population.remove_dead)
         """
-        pop.poplist.remove(self)
         pop.pop_size -= 1
+        pop.leave_marriage_market(self)
+        self.jobseekers.discard(self.ident)
         logger.debug("event:death,date:{},agent:{},age:{}".format(self.timestepper.date,
                                                            self.ident,
                                                            self.age_years))
         if self.employment.have_job():
             self.employment.job.retire()
+        pop.store.transfer(self._row, pop.dead_store)
 
 
 class Male(Agent):
@@ -214,8 +295,8 @@ class Male(Agent):
     subclass of agent corresponding to male agents
     """
     __slots__=()
-    def __init__(self, params, attributes, timestepper, stats):
-        Agent.__init__(self, params, attributes, timestepper, stats)
+    def __init__(self, attributes, context, store):
+        Agent.__init__(self, attributes, context, store)
 
 
     def step_activity(self, sim):
@@ -249,12 +330,17 @@ class Female(Agent):
     """
     subclass of agent corresponding to female agents
     """
-    __slots__ = ["fertility", "children"]
-    def __init__(self, params, attributes, timestepper, stats):
-        Agent.__init__(self, params, attributes, timestepper, stats)
+    __slots__ = ["fertility"]
+    def __init__(self, attributes, context, store):
+        Agent.__init__(self, attributes, context, store)
 
-        self.fertility = get_fertility(params, self)
-        self.children = []
+        self.fertility = get_fertility(self)
+
+    def children_ids(self):
+        """
+        Idents of this agent's children, eldest first
+        """
+        return self.genealogy.children_ids(self.ident)
 
 
     @property
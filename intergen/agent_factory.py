@@ -1,9 +1,13 @@
 from __future__ import division
 import random as rnd
 from itertools import count
-import datetime
 
 from intergen.agent import Male, Female
+from intergen.population_store import PopulationStore, ArchiveStore
+from intergen.hazard_tables import HazardTables
+from intergen.context import SimulationContext
+from intergen.genealogy import Genealogy
+from intergen.job_matching import JobseekerRegistry
 import numpy as np
 
 # Should have some facility for producing different types of agent
@@ -20,6 +24,18 @@ class AgentFactory(object):
         self.id_state = count()
         self.timestepper = timestepper
         self.stats = statistics_collector
+        # columnar store holding the attributes of all living agents,
+        # dead agents are moved to an append-only store.
+        self.store = PopulationStore(params["pop_size"], track_status=True)
+        self.dead_store = ArchiveStore()
+        # demographic rates by age, shared by all agents
+        self.hazards = HazardTables(params, timestepper)
+        self.genealogy = Genealogy(self.store, self.dead_store)
+        # filled by the population once the initial agents are made
+        self.jobseekers = JobseekerRegistry()
+        self.context = SimulationContext(params, statistics_collector,
+                                         timestepper, self.hazards,
+                                         self.genealogy, self.jobseekers)
 
         self.cum_start_dist = self.startup_age_cum_dist()
 
@@ -40,10 +56,9 @@ class AgentFactory(object):
     def make_agent(self, attributes):
         sex_rng = rnd.Random()
         if sex_rng.random() < self.params["prop_male_at_birth"]:
-            agent = Male(self.params, attributes, self.timestepper, self.stats)
+            agent = Male(attributes, self.context, self.store)
         else:
-            agent = Female(self.params, attributes,
-                           self.timestepper, self.stats)
+            agent = Female(attributes, self.context, self.store)
         return agent
 
     def startup_age_prob(self, age):
@@ -70,11 +85,11 @@ class AgentFactory(object):
         # return datetime.timedelta(days=max(1, (year * 365) + day))
         year = draw_from_age_dist(self.cum_start_dist)
         day = rnd.randint(0, 365)
-        return datetime.timedelta(days=max(1, (year * 365) + day))
+        return max(1, (year * 365) + day)
 
     def draw_experience(self, age):
         """
-        randomly draw agent experience, dependent on age
+        randomly draw agent experience in days, dependent on age in days
         only relevant for starting population
         """
         # potentially in the long run could make experience dependent on skill
@@ -82,9 +97,8 @@ class AgentFactory(object):
 
         # using 365 for year length is slightly off, but onlly slightly
         # means we overstate working life by c. 4 days
-        working_life = max(datetime.timedelta(0),
-                           age - datetime.timedelta(days=16 * 365))
-        experience = working_life.days * rnd.uniform(0.5, 1)  # parameterise ?
+        working_life = max(0, age - 16 * 365)
+        experience = working_life * rnd.uniform(0.5, 1)  # parameterise ?
         return int(experience)
 
     def draw_skill(self):
@@ -108,10 +122,9 @@ class AgentFactory(object):
         attributes = {}
         # attributes["fertility"] = self.initialise_fertility()
         attributes["age"] = self.draw_age_distribution()
-        attributes["experience"] = datetime.timedelta(
-            self.draw_experience(attributes["age"]))
+        attributes["experience"] = self.draw_experience(attributes["age"])
         attributes["skill"] = self.draw_skill()
-        attributes["DOB"] = self.timestepper.start_date - attributes["age"]
+        attributes["DOB"] = self.timestepper.start_ordinal - attributes["age"]
         attributes["aspiration"] = self.get_intial_aspiration()
         attributes["ident"] = next(self.id_state)
         return attributes
@@ -119,17 +132,16 @@ class AgentFactory(object):
     def create_new_born_attributes(self):
         attributes = {}
         attributes["age"] = self.get_new_born_age(
-            self.timestepper.get_timestep_length())
-        attributes["experience"] = datetime.timedelta(0)
+            self.timestepper.get_timestep_days())
+        attributes["experience"] = 0
         attributes["ident"] = next(self.id_state)
-        attributes["DOB"] = self.timestepper.date + attributes["age"]
+        attributes["DOB"] = self.timestepper.ordinal + attributes["age"]
         attributes["aspiration"] = self.params["default_aspiration"]
         attributes["skill"] = self.draw_skill()
         return attributes
 
-    def get_new_born_age(self, timestep_length):
-        inc = 1 + int(rnd.random() * timestep_length.days)
-        return datetime.timedelta(days=inc)
+    def get_new_born_age(self, timestep_days):
+        return 1 + int(rnd.random() * timestep_days)
 
     def get_intial_aspiration(self):
         """
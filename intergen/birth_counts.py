@@ -0,0 +1,89 @@
+"""
+Counts of births by calendar year, held for a moving window of recent years.
+"""
+from __future__ import division
+
+import numpy as np
+
+
+class BirthCounts(object):
+    """
+    Births per year for the `span` most recent years, in a ring buffer
+    indexed by year % span. Moving on to a later year clears the slots of
+    years that fall out of the window.
+
+    Reading a count behaves like the Counter previously used: years outside
+    the window have a count of zero.
+    """
+    def __init__(self, year, span=120):
+        self.span = span
+        self.counts = np.zeros(span)
+        self.latest_year = year
+        # incremented whenever counts change, so dependent values can be cached
+        self.version = 0
+        # version at which each slot last changed, so that values depending
+        # on only some years need not be recomputed when others change
+        self.stamps = np.zeros(span, dtype=np.int64)
+
+    def __getitem__(self, year):
+        return self.get(np.asarray(year))[()]
+
+    def get(self, years):
+        """
+        Return the counts for an array of years
+        """
+        years = np.asarray(years)
+        counts = self.counts[years % self.span]
+        return np.where(self.in_window(years), counts, 0.0)
+
+    def in_window(self, years):
+        return ((years > self.latest_year - self.span) &
+                (years <= self.latest_year))
+
+    def version_of(self, years):
+        """
+        The version at which the counts for any of an array of years last
+        changed
+        """
+        return self.stamps[np.asarray(years) % self.span].max()
+
+    def add(self, year, count=1):
+        """
+        Record count births in year
+        """
+        if year > self.latest_year:
+            self.advance(year)
+        if year > self.latest_year - self.span:
+            self.counts[year % self.span] += count
+            self.version += 1
+            self.stamps[year % self.span] = self.version
+
+    def add_many(self, years, weights=None):
+        """
+        Record one birth (or weights[i] births) for each entry of years
+        """
+        years = np.asarray(years)
+        if not len(years):
+            return
+        if years.max() > self.latest_year:
+            self.advance(years.max())
+        keep = self.in_window(years)
+        if weights is not None:
+            weights = np.asarray(weights)[keep]
+        self.counts += np.bincount(years[keep] % self.span, weights=weights,
+                                   minlength=self.span)
+        self.version += 1
+        self.stamps[years[keep] % self.span] = self.version
+
+    def advance(self, year):
+        """
+        Move the window on so that it ends at year
+        """
+        if year - self.latest_year >= self.span:
+            cleared = slice(None)
+        else:
+            cleared = np.arange(self.latest_year + 1, year + 1) % self.span
+        self.counts[cleared] = 0
+        self.latest_year = year
+        self.version += 1
+        self.stamps[cleared] = self.version
@@ -0,0 +1,34 @@
+"""
+References shared by all the agents of a simulation.
+"""
+
+
+class SimulationContext(object):
+    """
+    Hold the objects every agent needs but none owns, so that each agent
+    keeps a single reference rather than one to each of them.
+
+    params: dict
+        simulation parameters
+    stats: StatisticsCollector
+        collector notified of agent events
+    timestepper: TimeStepper
+        the simulation clock
+    hazards: HazardTables
+        demographic rates by age
+    genealogy: Genealogy
+        kinship links between agents, living and dead
+    jobseekers: JobseekerRegistry
+        the agents eligible for the labour market, by employment status
+    """
+    __slots__ = ["params", "stats", "timestepper", "hazards", "genealogy",
+                 "jobseekers"]
+
+    def __init__(self, params, stats, timestepper, hazards, genealogy,
+                 jobseekers):
+        self.params = params
+        self.stats = stats
+        self.timestepper = timestepper
+        self.hazards = hazards
+        self.genealogy = genealogy
+        self.jobseekers = jobseekers
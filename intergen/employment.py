@@ -5,19 +5,44 @@ import logging
 
 from numpy.random import poisson
 
+from .population_store import MISSING, column_property
 
 logger = logging.getLogger("intergen")
 
+NO_OFFERS = ()
+
 
 class Employment(object):
-    __slots__ = ["agent", "params", "wage", "job", "offers"]
+    __slots__ = ["agent", "_job", "offers"]
+
+    # the wage is held in the agent's store row, so that the wages of
+    # relatives can be gathered by ident
+    wage = column_property("wage", via="agent")
 
-    def __init__(self, agent, params):
+    def __init__(self, agent):
         self.agent = agent
-        self.params = params
-        self.wage = 0
-        self.job = None
-        self.offers = []
+        # the agent's wage and job_id columns start out as 0 and MISSING
+        self._job = None
+        # offers is an empty tuple until the first offer arrives, so that
+        # the many agents without offers do not each hold an empty list
+        self.offers = NO_OFFERS
+
+    @property
+    def params(self):
+        return self.agent.params
+
+    @property
+    def job(self):
+        return self._job
+
+    @job.setter
+    def job(self, job):
+        # keep the agent's job_id column, status counts and place among the
+        # jobseekers in step with the object reference
+        self._job = job
+        self.agent.job_id = MISSING if job is None else job.ident
+        self.agent.update_status_counts()
+        self.agent.jobseekers.set_employed(self.agent.ident, job is not None)
 
     # setup functions -------------------------------------------------
 
@@ -34,23 +59,30 @@ class Employment(object):
     def assess_offers(self, pop):
         """
         Examine offers seen. Choose the best one
+        Per-agent reference version of LabourMarket.resolve_offers
         """
         if not self.offers:
             return
         self.offers.sort(key=lambda x: x["wage"])
         winner, wage = self.offers[-1]["job"], self.offers[-1]["wage"]
+        self.offers = NO_OFFERS
+        self.accept_offer(winner, wage)
+
+    def accept_offer(self, winner, wage):
+        """
+        Take job winner at wage, being the best offer received, unless
+        already in a better paid job
+        """
         if self.job:
             # if self.job.calc_wage(self, pop) > wage:
-            if self.wage(self, pop) > wage:
+            if self.wage > wage:
                 # don't take any job..
-                self.offers = []
                 return
             else:
                 self.job.retire()
         self.job = winner
         self.wage = wage
         winner.fill_job(self)
-        self.offers = []
         logger.debug("event:started_job,date:{},agent:{},wage:{},skill:{},"
                      "aspiration:{}".format(self.agent.timestepper.date,
                                             self.agent.ident,
@@ -58,6 +90,15 @@ class Employment(object):
                                             self.agent.skill,
                                             self.agent.aspiration))
 
+    def receive_offer(self, offer):
+        """
+        Record an offer of a job, to be examined in assess_offers
+        """
+        if self.offers:
+            self.offers.append(offer)
+        else:
+            self.offers = [offer]
+
     def get_wage(self, pop):
         """
         Find the amount of earnings. Substitute a benefit if you're unemployed.
@@ -87,7 +128,7 @@ class Employment(object):
         """
         # at present this is the same as eligibility
         # but this needn't be the case
-        # can we make it so added to some sort of jobseeker dict?
+        # those participating are held by the JobseekerRegistry
         if self.eligible_for_market() and not self.have_job():
             return True
 
@@ -106,6 +147,7 @@ class Employment(object):
         """
         send out a number of applications to vacant jobs
         these vary depending on current employment status
+        Per-agent reference version of LabourMarket.take_applications
         """
         #  mult = self.pop.sim.timestep_length / self.params["year_length"]
         # should use functions here to interact with labour market?
@@ -156,8 +198,8 @@ class Employment(object):
         if not self.params["experience_floor"]:
             return True
         else:
-            condition1 = vac.experience_floor <= self.agent.experience.days
-            condition2 = (self.agent.experience.days - vac.experience_floor < 365 * 4
+            condition1 = vac.experience_floor <= self.agent.experience
+            condition2 = (self.agent.experience - vac.experience_floor < 365 * 4
                           or vac.experience_floor > 365 * (self.params["exp_max"] - 4))
             return condition1 and condition2
 
@@ -168,11 +210,10 @@ class Employment(object):
 
 class InactiveEmployment(Employment):
     # Not Used
-    def __init__(self, agent, params):
+    def __init__(self, agent):
         self.agent = agent
-        self.params = params
-        self.wage = None
-        self.job = None
+        self._job = None
+        self.offers = NO_OFFERS
 
     def job_setup_activity(self, market):
         pass
@@ -9,7 +9,8 @@ from collections import Counter
 # for agent.
 import random as rnd
 
-from .agent import calculate_age_years
+from .utils import age_years_from_ordinal, year_from_ordinal
+from .population_store import column_property, MISSING
 from math import exp, log
 import numpy as np
 from scipy.stats import norm
@@ -20,11 +21,21 @@ logger = logging.getLogger("intergen")
 
 
 class BaseFertility(object):
-    __slots__=["params", "agent", "date_of_last_birth", "parity"]
-    def __init__(self, params, agent):
-        self.params = params
+    __slots__=["agent"]
+
+    # parity and dates of birth of the first child and of the last birth
+    # (as day ordinals, MISSING if none) are held in the agent's store row
+    parity = column_property("parity", via="agent")
+    date_of_first_birth = column_property("date_of_first_birth", via="agent")
+    date_of_last_birth = column_property("date_of_last_birth", via="agent")
+
+    @property
+    def params(self):
+        return self.agent.params
+
+    def __init__(self, agent):
         self.agent = agent
-        self.date_of_last_birth = None
+        self.date_of_last_birth = MISSING
         self.parity = 0
 
     def reproductive_behaviour(self):
@@ -35,13 +46,15 @@ class BaseFertility(object):
 
     def give_birth(self, pop):
         """
+        Returns the new born child
         """
         child = pop.agent_factory.make_new_born()
         self.parity += 1
-        self.agent.children.append(child)
+        self.agent.genealogy.add_child(self.agent, child)
         pop.add_child(child)
-        child.mother = self.agent
-        self.date_of_last_birth = self.agent.timestepper.date
+        if self.parity == 1:
+            self.date_of_first_birth = child.DOB
+        self.date_of_last_birth = self.agent.timestepper.ordinal
         logger.debug("event:birth,date:{},agent:{},"
                      "parity:{},child:{},female:{}"
                      "".format(self.agent.timestepper.date,
@@ -53,26 +66,18 @@ class BaseFertility(object):
         self.agent.notify_statistics_collector("birth")
         if self.parity == 1:
             self.agent.notify_statistics_collector("first_birth")
-        if child.isfemale:
-            pop.female_birth_ts[child.DOB.year] += 1
-        else:
-            pop.male_birth_ts[child.DOB.year] += 1 
+        pop.record_birth(child)
+        return child
 
 
 class EasterlinFertility(BaseFertility):
-    __slots__ = ["sub_fert", "fecundity"]
-    def __init__(self, params, agent):
-        self.params = params
+    # fecundity and subsequent birth rates are read from the agent's
+    # shared HazardTables
+    __slots__ = ()
+    def __init__(self, agent):
         self.agent = agent
-        self.date_of_last_birth = None
+        self.date_of_last_birth = MISSING
         self.parity = 0
-        self.sub_fert = subsequent_fertility(params["further_fertility_a"],
-                                             params["further_fertility_b"],
-                                             params["further_fertility_mu"])
-        self.fecundity = get_fecundity_func(params["fecundity_a"],
-                                            params["fecundity_b"],
-                                            params["fecundity_c"],
-                                            params["fecundity_mu"])
 
     def reproductive_behaviour(self, pop):
         """
@@ -85,29 +90,30 @@ class EasterlinFertility(BaseFertility):
             birth_flag = self.check_family_formation(pop)
         else:
             birth_flag = self.check_subsequent_births(pop)
-        fec = self.fecundity(self.agent.age_years)
+        hazards = self.agent.hazards
+        fec = hazards.at(hazards.fecundity, self.agent.age_years)
         if birth_flag and rnd.random() < fec:
             self.give_birth(pop)
 
     def give_birth(self, pop):
         """
         """
-        super(EasterlinFertility, self).give_birth(pop)
+        child = super(EasterlinFertility, self).give_birth(pop)
 
-        child = self.agent.children[-1]
-        if self.params["inheritance"] and self.agent.partner:
+        if self.params["inheritance"] and self.agent.have_partner():
             k = self.params["inheritance_corr"]
-            m = (self.agent.skill + self.agent.partner.skill) / 2.0
+            m = (self.agent.skill + self.agent.partner_value("skill")) / 2.0
             child.skill = norm.cdf(np.random.normal(k * norm.ppf(m), 1 - k ** 2))
             #child.skill = (self.agent.skill + self.agent.partner.skill) / 2.0
 
         # if child.isfemale():
-        #     EasterlinFertility.birth_ts[child.DOB.year] += 1
+        #     EasterlinFertility.birth_ts[year_from_ordinal(child.DOB)] += 1
+        return child
 
     def check_family_formation(self, pop):
         """
         """
-        wage = self.agent.partner.employment.get_wage(pop)
+        wage = self.agent.partner_wage(pop)
         threshold = self.wage_threshold()
         logging.debug("checking family formation: wage = {:2f},"
                       "threshold = {:2f}".format(wage, threshold))
@@ -126,7 +132,7 @@ class EasterlinFertility(BaseFertility):
         """
         weight = self.params["female_weight_in_threshold"]
         return (self.agent.aspiration * weight +
-                self.agent.partner.aspiration * (1 - weight))
+                self.agent.partner_value("aspiration") * (1 - weight))
 
     def check_subsequent_births(self, pop):
         """
@@ -134,14 +140,13 @@ class EasterlinFertility(BaseFertility):
         examined based on current state whether  further children are desired
         / scheduled
         """
-        time_since_last_birth = calculate_age_years(self.date_of_last_birth,
+        time_since_last_birth = age_years_from_ordinal(self.date_of_last_birth,
                                                     self.agent.timestepper.date)
         if time_since_last_birth < 1:
             return False
-        mult = (self.agent.timestepper.get_timestep_days() /
-                self.params["year_length"])
-        prob_of_birth = (self.sub_fert(time_since_last_birth) *
-                         (mult / self.parity))
+        hazards = self.agent.hazards
+        prob_of_birth = (hazards.at(hazards.subsequent_step,
+                                    time_since_last_birth) / self.parity)
         if rnd.random() < prob_of_birth and self.check_family_formation(pop):
             return True
         else:
@@ -156,12 +161,12 @@ def subsequent_fertility(a, b, mu):
 
 
 class SimpleFertility(BaseFertility):
+    __slots__ = ()
     working_ages = np.arange(15, 70)
 
-    def __init__(self, params, agent):
-        self.params = params
+    def __init__(self, agent):
         self.agent = agent
-        self.date_of_last_birth = None
+        self.date_of_last_birth = MISSING
         self.parity = 0
 
 
@@ -196,7 +201,7 @@ class SimpleFertility(BaseFertility):
         var = (cohort_width / 2) ** 2
 
         birth_years = self.agent.timestepper.date.year - self.working_ages
-        weights = np.exp(- (1 / var) * (birth_years - self.agent.DOB.year)**2)
+        weights = np.exp(- (1 / var) * (birth_years - year_from_ordinal(self.agent.DOB))**2)
 
         # we want feedback coefficients that are negative for big cohorts
         # but positive for larger cohorts.
@@ -207,23 +212,16 @@ class SimpleFertility(BaseFertility):
         """
         Give birth, adding to yearly count in class variable
         """
-        super(SimpleFertility, self).give_birth(pop)
-        child = self.agent.children[-1]
+        child = super(SimpleFertility, self).give_birth(pop)
 
-        if child.isfemale:
-            pop.female_birth_ts[child.DOB.year] += 1
-        else:
-            pop.male_birth_ts[child.DOB.year] += 1 
+        pop.record_birth(child)
+        return child
 
     def base_fertility(self):
         """
         """
-        mult = (self.agent.timestepper.get_timestep_days() /
-                self.params["year_length"])
-        a = self.params["base_fertility_a"]
-        b = self.params["base_fertility_b"]
-        c = self.params["base_fertility_c"]
-        return hadwiger_fertility(self.agent.age_years, a, b, c) * mult
+        hazards = self.agent.hazards
+        return hazards.at(hazards.base_fertility_step, self.agent.age_years)
 
     def check_family_formation(self, pop):
         """
@@ -236,8 +234,9 @@ class SimpleFertility(BaseFertility):
 
 
 class MarriedFertility(SimpleFertility):
-    def __init__(self, params, agent):
-        super(MarriedFertility, self).__init__(params, agent)
+    __slots__ = ()
+    def __init__(self, agent):
+        super(MarriedFertility, self).__init__(agent)
 
     def reproductive_behaviour(self, pop):
         if self.agent.have_partner():
@@ -245,8 +244,9 @@ class MarriedFertility(SimpleFertility):
 
 
 class PartnerFertility(SimpleFertility):
-    def __init__(self, params, agent):
-        super(PartnerFertility, self).__init__(params, agent)
+    __slots__ = ()
+    def __init__(self, agent):
+        super(PartnerFertility, self).__init__(agent)
 
     def reproductive_behaviour(self, pop):
         if self.agent.have_partner():
@@ -267,7 +267,7 @@ class PartnerFertility(SimpleFertility):
         ages = np.arange(15, 70)
         birth_years = self.agent.timestepper.date.year - ages
         weights = np.exp(- (1 / var) *
-                         (birth_years - self.agent.partner.DOB.year)**2)
+                         (birth_years - year_from_ordinal(self.agent.partner_value("DOB")))**2)
 
         # we want feedback coefficients that are negative for big cohorts
         # but positive for larger cohorts.
@@ -279,11 +279,13 @@ class SoftEasterlinFertility(EasterlinFertility):
     # Define a probabilistic relationship for fertility and relative incomes,
     # where ratio between own income and aspiration probabilistically effects
     # childbirth
-    def __init__(self, params, agent):
-        super(SoftEasterlinFertility, self).__init__(params, agent)
+    __slots__ = ()
+    def __init__(self, agent):
+        super(SoftEasterlinFertility, self).__init__(agent)
 
     def reproductive_behaviour(self, pop):
-        if not self.agent.have_partner() or not self.agent.partner.employment.have_job():
+        if (not self.agent.have_partner() or
+                self.agent.partner_value("job_id") == MISSING):
             return
 
         feedback_coef = self.calc_feedback(pop)
@@ -301,7 +303,7 @@ class SoftEasterlinFertility(EasterlinFertility):
     def calc_feedback(self, pop):
         asp = self.wage_threshold()
         offset = self.params["aspiration_offset"]
-        income = self.agent.partner.employment.get_wage(pop)
+        income = self.agent.partner_wage(pop)
 
         logging.debug("calculating feedback - aspiration : {:3f},"
                       " income : {:3f}".format(asp, income))
@@ -312,12 +314,8 @@ class SoftEasterlinFertility(EasterlinFertility):
         """
         """
         # could be dependent on parity
-        mult = (self.agent.timestepper.get_timestep_days() /
-                self.params["year_length"])
-        a = self.params["base_fertility_a"]
-        b = self.params["base_fertility_b"]
-        c = self.params["base_fertility_c"]
-        return hadwiger_fertility(self.agent.age_years, a, b, c) * mult
+        hazards = self.agent.hazards
+        return hazards.at(hazards.base_fertility_step, self.agent.age_years)
 
     def check_family_formation(self, pop):
         return True
@@ -327,8 +325,10 @@ class ChildCostFertility(EasterlinFertility):
     # Assume disposable income is effected by presence of children
     # Each child costs money to keep. Desire for another depends on how reduced
     # income compares to parent.
-    def __init__(self, params, agent):
-        super(ChildCostFertility, self).__init__(params, agent)
+    __slots__ = ()
+
+    def __init__(self, agent):
+        super(ChildCostFertility, self).__init__(agent)
         raise NotImplementedError
 
 
@@ -338,8 +338,8 @@ class ParityEasterlinFertility(EasterlinFertility):
     """
     __slots__ = ()
 
-    def __init__(self, params, agent):
-        super(ParityEasterlinFertility, self).__init__(params, agent)
+    def __init__(self, agent):
+        super(ParityEasterlinFertility, self).__init__(agent)
 
     def check_subsequent_births(self, pop):
         """
@@ -347,7 +347,7 @@ class ParityEasterlinFertility(EasterlinFertility):
         examined based on current state whether  further children are desired
         / scheduled
         """
-        time_since_last_birth = calculate_age_years(self.date_of_last_birth,
+        time_since_last_birth = age_years_from_ordinal(self.date_of_last_birth,
                                                     self.agent.timestepper.date)
         #print("time since last birth = {}".format(time_since_last_birth))
         #print("age = {}".format(self.agent.age_years))
@@ -356,10 +356,10 @@ class ParityEasterlinFertility(EasterlinFertility):
         feedback_mult = self.params["parity_feedback_mult"]
         feedback_coef = 1 + self.calc_feedback(pop) * feedback_mult
         #print("feedback_coef = {}, parity ={}".format(feedback_coef, self.parity))
-        mult = (self.agent.timestepper.get_timestep_days() /
-                self.params["year_length"]) * feedback_coef
-        prob_of_birth = (self.sub_fert(time_since_last_birth) *
-                         (mult / self.parity))
+        hazards = self.agent.hazards
+        prob_of_birth = (hazards.at(hazards.subsequent_step,
+                                    time_since_last_birth) *
+                         (feedback_coef / self.parity))
         #print("prob_of_birth = {}".format(prob_of_birth))
         #if rnd.random() < prob_of_birth and self.check_family_formation(pop):
         if rnd.random() < prob_of_birth:
@@ -372,7 +372,7 @@ class ParityEasterlinFertility(EasterlinFertility):
     def calc_feedback(self, pop):
         asp = self.wage_threshold()
         par_offset = self.params["parity_offset"]
-        income = self.agent.partner.employment.get_wage(pop)
+        income = self.agent.partner_wage(pop)
         asp_offset = self.params["aspiration_offset"]
 
         logging.debug("calculating feedback - aspiration : {:3f},"
@@ -390,13 +390,13 @@ class ProbEasterlinFertility(ParityEasterlinFertility):
     """
     __slots__ = ()
 
-    def __init__(self, params, agent):
-        super(ProbEasterlinFertility, self).__init__(params, agent)
+    def __init__(self, agent):
+        super(ProbEasterlinFertility, self).__init__(agent)
 
     def check_family_formation(self, pop):
         """
         """
-        wage = self.agent.partner.employment.get_wage(pop)
+        wage = self.agent.partner_wage(pop)
         threshold = self.wage_threshold()
         logging.debug("checking family formation: wage = {:2f},"
                       "threshold = {:2f}".format(wage, threshold))
@@ -422,9 +422,9 @@ class ProbEasterlinFertility(ParityEasterlinFertility):
 class HeteroEasterlinFertility(EasterlinFertility):
     __slots__ = ["desired_fam_size", "aspiration_offset"]
 
-    def __init__(self, params, agent):
-        super(HeteroEasterlinFertility, self).__init__(params,agent)
-        self.desired_fam_size = get_desired_family_size(params)
+    def __init__(self, agent):
+        super(HeteroEasterlinFertility, self).__init__(agent)
+        self.desired_fam_size = get_desired_family_size(self.params)
         #self.aspiration_offset = rnd.normalvariate(self.params["aspiration_offset"],
         #                                    self.params["aspiration_var"])
         self.aspiration_offset = rnd.uniform(0, self.params["aspiration_offset_max"])
@@ -433,7 +433,7 @@ class HeteroEasterlinFertility(EasterlinFertility):
     def check_family_formation(self, pop):
         """
         """
-        wage = self.agent.partner.employment.get_wage(pop)
+        wage = self.agent.partner_wage(pop)
         threshold = self.wage_threshold()
         logging.debug("checking family formation: wage = {:2f},"
                       "threshold = {:2f}".format(wage, threshold))
@@ -451,13 +451,13 @@ class HeteroEasterlinFertility(EasterlinFertility):
         examined based on current state whether  further children are desired
         / scheduled
         """
-        time_since_last_birth = calculate_age_years(self.date_of_last_birth,
+        time_since_last_birth = age_years_from_ordinal(self.date_of_last_birth,
                                                     self.agent.timestepper.date)
 
         
         asp = self.wage_threshold()
         par_offset = self.params["parity_offset"]
-        income = self.agent.partner.employment.get_wage(pop)
+        income = self.agent.partner_wage(pop)
 
         if time_since_last_birth < 1:
             return False
@@ -511,27 +511,28 @@ def hadwiger_fertility(x, a, b, c):
     return part1 * part2
 
 
-def get_fertility(params, agent):
+def get_fertility(agent):
     """
-    Construct the fertility object specified by the contents of parameter
-    dictionary
+    Construct the fertility object specified by the contents of the agent's
+    parameter dictionary
     """
+    params = agent.params
     if params["fertility_type"] == "easterlin":
-        return EasterlinFertility(params, agent)
+        return EasterlinFertility(agent)
     elif params["fertility_type"] == "simple":
-        return SimpleFertility(params, agent)
+        return SimpleFertility(agent)
     elif params["fertility_type"] == "married":
-        return MarriedFertility(params, agent)
+        return MarriedFertility(agent)
     elif params["fertility_type"] == "partner":
-        return PartnerFertility(params, agent)
+        return PartnerFertility(agent)
     elif params["fertility_type"] == "soft_easterlin":
-        return SoftEasterlinFertility(params, agent)
+        return SoftEasterlinFertility(agent)
     elif params["fertility_type"] == "parity_easterlin":
-        return ParityEasterlinFertility(params, agent)
+        return ParityEasterlinFertility(agent)
     elif params["fertility_type"] == "prob_easterlin":
-        return ProbEasterlinFertility(params, agent)
+        return ProbEasterlinFertility(agent)
     elif params["fertility_type"] == "hetero":
-        return HeteroEasterlinFertility(params, agent)
+        return HeteroEasterlinFertility(agent)
     else:
         return NotImplementedError("Unrecognised fertility_type parameter:"
                                    " {}".format(params["fertility_type"]))
@@ -0,0 +1,120 @@
+"""
+Kinship between agents, held as ident columns of the population stores.
+"""
+from __future__ import division
+
+import numpy as np
+
+from .population_store import MISSING
+
+
+class Genealogy(object):
+    """
+    Follow partner, mother, household and children links between agents.
+
+    Links are idents rather than object references, so they can be followed
+    for whole arrays of agents at once, and to agents that have died: the
+    kinship columns of the dead are kept in an ArchiveStore.
+
+    Children are found through a list running from a mother's
+    youngest_child_id through each child's elder_sibling_id.
+    """
+    def __init__(self, live_store, dead_store):
+        self.live_store = live_store
+        self.dead_store = dead_store
+
+    # lookups ---------------------------------------------------------
+
+    def live_agent(self, ident):
+        """
+        Return the living agent with ident, or None
+        """
+        row = self.live_store.row_of_ident(ident)
+        if row == MISSING:
+            return None
+        return self.live_store.agents[row]
+
+    def gather(self, name, idents, missing=MISSING):
+        """
+        Values of column name for the agents with the given idents, living or
+        dead. Where an ident is MISSING (or unknown) missing is returned, as
+        it is for the dead when the column is not archived.
+        """
+        idents = np.asarray(idents, dtype=np.int64)
+        column = getattr(self.live_store, name)
+        values = np.full(idents.shape, missing, dtype=column.dtype)
+        live_rows = self.live_store.rows_of(idents)
+        live = live_rows != MISSING
+        values[live] = column[live_rows[live]]
+        if not self.dead_store.has_column(name):
+            return values
+        dead_rows = self.dead_store.rows_of(idents[~live])
+        dead = dead_rows != MISSING
+        dead_values = values[~live]
+        dead_values[dead] = getattr(self.dead_store, name)[dead_rows[dead]]
+        values[~live] = dead_values
+        return values
+
+    def value(self, name, ident, missing=MISSING):
+        """
+        As gather, for a single ident
+        """
+        for store in (self.live_store, self.dead_store):
+            row = store.row_of_ident(ident)
+            if row != MISSING:
+                if not store.has_column(name):
+                    return missing
+                return getattr(store, name).item(row)
+        return missing
+
+    def wages(self, idents, pop):
+        """
+        Household incomes contributed by the agents with idents: the wage of
+        those in work, and the benefit level otherwise (including the dead).
+        """
+        employed = self.gather("job_id", idents) != MISSING
+        wages = self.gather("wage", idents, missing=0.0)
+        return np.where(employed, wages, pop.benefit_level)
+
+    def wage_of(self, ident, pop):
+        """
+        Wage of a single agent, as given by Employment.get_wage for the living
+        and the benefit level for the dead.
+        """
+        agent = self.live_agent(ident)
+        if agent is None:
+            return pop.benefit_level
+        return agent.employment.get_wage(pop)
+
+    def children_ids(self, ident):
+        """
+        Idents of the children of the agent with ident, eldest first
+        """
+        children = []
+        child = self.value("youngest_child_id", ident)
+        while child != MISSING:
+            children.append(child)
+            child = self.value("elder_sibling_id", child)
+        children.reverse()
+        return children
+
+    # changes ---------------------------------------------------------
+
+    def add_child(self, mother, child):
+        """
+        Record the birth of child to mother, placing the child in the
+        mother's household
+        """
+        child.mother_id = mother.ident
+        child.household_id = mother.household_id
+        child.elder_sibling_id = mother.youngest_child_id
+        mother.youngest_child_id = child.ident
+
+    def partner(self, female, male):
+        """
+        Record the partnership of female and male, forming a new household
+        """
+        female.partner = male
+        male.partner = female
+        female.household_id = female.ident
+        male.household_id = female.ident
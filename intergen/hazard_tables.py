@@ -0,0 +1,99 @@
+"""
+Age-indexed tables of the demographic rates shared by all agents.
+"""
+from __future__ import division
+
+import numpy as np
+
+from .utils import gompertz_hazard, partnering_hazard
+
+
+# tables run from age (or duration) 0 up to and including this many years;
+# older ages are looked up at this age.
+MAX_HAZARD_AGE = 110
+
+
+class HazardTables(object):
+    """
+    Mortality, fertility and partnering rates by whole year of age, computed
+    once for the whole simulation rather than by each agent.
+
+    Tables with names ending in _step give the probability of the event
+    during the current timestep, and are rebuilt by refresh when the
+    timestep length changes. Other tables are annual rates or multipliers.
+
+    mortality_step: gompertz mortality, zero up to gompertz_start
+    partnering_step: hazard of entering the marriage market
+    base_fertility_step: Hadwiger base fertility (SimpleFertility etc.)
+    subsequent_step: birth hazard by whole years since the last birth,
+        before division by parity (EasterlinFertility)
+    fecundity: age multiplier of birth probabilities (EasterlinFertility)
+    """
+    def __init__(self, params, timestepper):
+        self.params = params
+        self.timestepper = timestepper
+        self.ages = np.arange(MAX_HAZARD_AGE + 1)
+        self.timestep_days = None
+        self.mortality = gompertz_hazard(self.ages,
+                                         params["gompertz_a"],
+                                         params["gompertz_b"],
+                                         params["gompertz_l"],
+                                         params["gompertz_start"])
+        self.partnering = partnering_hazard(self.ages,
+                                            params["partnering_a"],
+                                            params["partnering_alpha"],
+                                            params["partnering_mu"],
+                                            params["partnering_lambda"])
+        self.base_fertility = hadwiger_table(self.ages,
+                                             params["base_fertility_a"],
+                                             params["base_fertility_b"],
+                                             params["base_fertility_c"])
+        self.subsequent = (params["further_fertility_a"] *
+                           np.exp(-params["further_fertility_b"] *
+                                  (self.ages -
+                                   params["further_fertility_mu"]) ** 2))
+        centred = self.ages - params["fecundity_mu"]
+        self.fecundity = (params["fecundity_a"] -
+                          params["fecundity_b"] * centred -
+                          params["fecundity_c"] * centred ** 2)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuild the per-timestep tables if the timestep length has changed
+        """
+        timestep_days = self.timestepper.get_timestep_days()
+        if timestep_days == self.timestep_days:
+            return
+        self.timestep_days = timestep_days
+        self.mult = timestep_days / self.params["year_length"]
+        self.mortality_step = self.mortality * self.mult
+        self.partnering_step = self.partnering * self.mult
+        self.base_fertility_step = self.base_fertility * self.mult
+        self.subsequent_step = self.subsequent * self.mult
+
+    @staticmethod
+    def index(ages):
+        """
+        Table rows for an array of ages in years
+        """
+        return np.clip(ages, 0, MAX_HAZARD_AGE)
+
+    @staticmethod
+    def at(table, age):
+        """
+        Look up a single integer age in table
+        """
+        return table[min(max(age, 0), MAX_HAZARD_AGE)]
+
+
+def hadwiger_table(ages, a, b, c):
+    """
+    Vectorised fertility.hadwiger_fertility, taken as zero at age zero
+    """
+    ages = np.asarray(ages, dtype=float)
+    rates = np.zeros(len(ages))
+    x = ages[ages > 0]
+    rates[ages > 0] = (a * (b / c) * (c / x) ** (3 / 2) *
+                       np.exp(-(b ** 2) * ((c / x) + (x / c) - 2)))
+    return rates
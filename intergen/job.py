@@ -1,30 +1,70 @@
 from __future__ import division
-import random as rnd
 from math import exp
 
 import logging
 import numpy as np
 
+from .population_store import (PopulationStore, StoreView, column_property,
+                               MISSING)
+
 
 logger = logging.getLogger("intergen")
 
-class Job(object):
+
+class JobTable(PopulationStore):
+    """
+    Columnar storage for the attributes of jobs, one row per job in the
+    labour market, so that the wages of all jobs can be computed at once.
+    """
+    columns = [("ident", np.int64),
+               ("difficulty", np.float64),
+               ("experience_floor", np.float64),
+               # ident of the occupying agent, MISSING if vacant
+               ("occupant_id", np.int64)]
+
+    defaults = {"occupant_id": MISSING}
+
+
+class Job(StoreView):
     """
     Class representing a job object
+    Attributes held in the labour market's JobTable are accessed through
+    column properties.
     """
-    def __init__(self, labour_market, params):
+    ident = column_property("ident")
+    difficulty = column_property("difficulty")
+    experience_floor = column_property("experience_floor")
+    occupant_id = column_property("occupant_id")
+
+    working_ages = np.arange(15, 70)
+
+    def __init__(self, labour_market, params, difficulty, experience_floor=0.0):
         """
         New job object, with a specific difficulty level
+        (see LabourMarket.draw_job_attributes)
         """
+        self.attach(labour_market.job_table)
         self.occupant = None
         self.market = labour_market  # instance of labour market class.
+        self.ident = next(labour_market.job_ids)
+        self._store.index_ident(self._row)
         self.params = params
-        self.difficulty = rnd.random() * self.market.difficulty_bound()
+        self.difficulty = difficulty
+        self.experience_floor = experience_floor
         self.applicants = []
-        if params["experience_floor"]:
-            self.experience_floor = (max(0, rnd.uniform(-15, params["exp_max"]) *
-             self.params["year_length"]))
-        self.working_ages = np.arange(15, 70)
+
+    @property
+    def occupant(self):
+        """
+        Employment of the agent in the job, or None
+        """
+        return self._occupant
+
+    @occupant.setter
+    def occupant(self, occupant):
+        # keep the occupant_id column in step with the object reference
+        self._occupant = occupant
+        self.occupant_id = MISSING if occupant is None else occupant.agent.ident
 
     def make_redundant(self):
         """
@@ -33,9 +73,11 @@ class Job(object):
         if self.occupant:
             self.occupant.job = None
             self.occupant = None
+            self.market.employed_wages.discard(self.ident)
         else:
             self.market.vacancies.remove(self)
         self.market.joblist.remove(self)
+        self._store.remove(self._row)
 
     def retire(self):
         """
@@ -44,13 +86,18 @@ class Job(object):
         """
         self.occupant.job = None
         self.occupant = None
+        self.market.employed_wages.discard(self.ident)
         self.market.vacancies.append(self)
 
     def update_wage(self, pop):
+        """
+        Per-job reference version of LabourMarket.update_wages
+        """
         if not self.occupant:
             return
         else:
             self.occupant.wage = self.calc_wage(self.occupant, pop)
+            self.market.employed_wages.set(self.ident, self.occupant.wage)
 
     def calc_wage(self, employee, pop):
         prod = self.get_prod(employee)
@@ -118,11 +165,12 @@ class Job(object):
     def offer_job(self, pop):
         """
         assess applicant and offer to employ someone
+        Per-job reference version of LabourMarket.send_offers
         """
         assert not self.occupant
         if self.params["experience_floor"]:
             self.applicants = [app for app in self.applicants if
-                               app.agent.experience.days >= self.experience_floor]
+                               app.agent.experience >= self.experience_floor]
         if not self.applicants:
             return False
         result = self._pick_winner(pop, self.applicants)
@@ -136,7 +184,7 @@ class Job(object):
             return False
         winner = self.applicants[ind]
         offer = {"job": self, "wage": wage}
-        winner.offers.append(offer)
+        winner.receive_offer(offer)
         self.applicants = []
         return True
 
@@ -168,11 +216,12 @@ class Job(object):
 
     def fill_job(self, applicant):
         """
-        Applicant has accepted a job offer
-        Remove self from vacancies list
+        Applicant has accepted a job offer, at the wage already set
+        Remove self from the vacancy pool
         """
         assert applicant.agent.age_years > 14
         self.occupant = applicant
+        self.market.employed_wages.set(self.ident, applicant.wage)
         self.market.vacancies.remove(self)
 
     def occupied(self):
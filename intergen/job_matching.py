@@ -0,0 +1,258 @@
+"""
+Matching of jobseekers to vacancies in batches.
+
+Applications are drawn for all jobseekers at once and held as a sparse
+vacancy x applicant matrix, from which the winner for each vacancy is chosen
+with segment-wise reductions rather than a Python loop over applicants.
+Jobseekers are found from a registry kept up to date as agents change
+status, rather than by scanning the population.
+"""
+from __future__ import division
+import random as rnd
+
+import numpy as np
+import numpy.random as nprnd
+
+
+class ApplicationMatrix(object):
+    """
+    Applications to vacancies in compressed sparse row form. The store rows
+    of those applying to the vacancy jobs[i] are
+    rows[indptr[i]:indptr[i + 1]], in the order in which they applied.
+    Only vacancies with at least one applicant have a row in the matrix.
+    """
+    def __init__(self, rows, targets, vacancies):
+        """
+        Parameters
+        ----------
+        rows: array
+            Store row of the applicant for each application
+        targets: array
+            Position in vacancies of the job applied for, per application
+        vacancies: JobPool
+        """
+        order = np.argsort(targets, kind="stable")
+        positions, counts = np.unique(targets, return_counts=True)
+        self.rows = rows[order]
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+        self.jobs = [vacancies[pos] for pos in positions.tolist()]
+        self.job_rows = np.array([job._row for job in self.jobs],
+                                 dtype=np.int64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def counts(self):
+        """
+        Number of applicants to each vacancy
+        """
+        return np.diff(self.indptr)
+
+
+class IdentSet(object):
+    """
+    A set of agent idents held densely in an array, with the position of
+    each ident indexed, so that additions and removals take constant time and
+    the members can be read as an array without a copy. Removal moves the
+    last ident into the gap, so the order of idents is arbitrary.
+    """
+    def __init__(self, capacity=1024):
+        self.members = np.zeros(max(int(capacity), 1), dtype=np.int64)
+        self.position = {}  # ident -> index in members
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, ident):
+        return ident in self.position
+
+    def idents(self):
+        """
+        The idents held, as a view of the occupied part of the array
+        """
+        return self.members[:self.size]
+
+    def add(self, ident):
+        if ident in self.position:
+            return
+        if self.size == len(self.members):
+            members = np.zeros(2 * self.size, dtype=np.int64)
+            members[:self.size] = self.members
+            self.members = members
+        self.members[self.size] = ident
+        self.position[ident] = self.size
+        self.size += 1
+
+    def discard(self, ident):
+        """
+        Remove ident if held, returning whether it was
+        """
+        pos = self.position.pop(ident, None)
+        if pos is None:
+            return False
+        self.size -= 1
+        if pos != self.size:
+            last = self.members.item(self.size)
+            self.members[pos] = last
+            self.position[last] = pos
+        return True
+
+
+class JobseekerRegistry(object):
+    """
+    The idents of the living agents eligible for the labour market (see
+    Employment.eligible_for_market), split into those without and those
+    with a job. It is kept up to date as agents are hired or lose their
+    jobs (through Employment.job), age into or out of eligibility (in
+    Population.update_ages) and die, so that the application phase need
+    only visit those who may apply.
+    """
+    def __init__(self):
+        self.unemployed = IdentSet()
+        self.employed = IdentSet()
+
+    def __len__(self):
+        return len(self.unemployed) + len(self.employed)
+
+    def __contains__(self, ident):
+        return ident in self.unemployed or ident in self.employed
+
+    def add(self, idents, employed):
+        """
+        Register the agents with an array of idents, as employed or not
+        according to the matching boolean array
+        """
+        for ident, has_job in zip(np.asarray(idents).tolist(),
+                                  np.asarray(employed).tolist()):
+            (self.employed if has_job else self.unemployed).add(ident)
+
+    def discard(self, ident):
+        """
+        Remove the agent with ident, if registered
+        """
+        if not self.unemployed.discard(ident):
+            self.employed.discard(ident)
+
+    def set_employed(self, ident, employed):
+        """
+        Move a registered agent to the employed or the unemployed. Agents
+        not registered (not eligible) are ignored.
+        """
+        if employed:
+            source, target = self.unemployed, self.employed
+        else:
+            source, target = self.employed, self.unemployed
+        if source.discard(ident):
+            target.add(ident)
+
+
+class OfferLedger(object):
+    """
+    The job offers made in one timestep, as parallel arrays of the ident
+    of the agent offered, the ident of the job and the wage offered.
+    """
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return len(self.agent_ids)
+
+    def clear(self):
+        self.agent_ids = np.zeros(0, dtype=np.int64)
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.wages = np.zeros(0)
+
+    def record(self, agent_ids, job_ids, wages):
+        """
+        Add offers given by arrays of agent idents, job idents and wages
+        """
+        self.agent_ids = np.concatenate([self.agent_ids, agent_ids])
+        self.job_ids = np.concatenate([self.job_ids, job_ids])
+        self.wages = np.concatenate([self.wages, wages])
+
+    def best_offers(self):
+        """
+        Index of the highest offer (the first recorded, if equal) to each
+        agent offered a job
+        """
+        order = np.lexsort((-self.wages, self.agent_ids))
+        sorted_ids = self.agent_ids[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+        return order[first]
+
+
+def draw_targets(counts, n_vacancies):
+    """
+    Draw, for applicant i, counts[i] distinct positions uniformly from
+    range(n_vacancies) (all of them if counts[i] is larger). n_vacancies
+    may be a single number or give a different number for each applicant.
+    Returns arrays giving the applicant index and position of each
+    application.
+    """
+    n_vacancies = np.broadcast_to(n_vacancies, np.shape(counts))
+    counts = np.minimum(counts, n_vacancies)
+    # applicants asking for most of the vacancies open to them are sampled
+    # one by one, as redrawing clashes would be slow for them
+    dense = counts * 2 > n_vacancies
+    applicants = np.repeat(np.arange(len(counts)), np.where(dense, 0, counts))
+    limits = n_vacancies[applicants]
+    targets = draw_below(limits)
+    while True:
+        order = np.lexsort((targets, applicants))
+        sorted_applicants = applicants[order]
+        sorted_targets = targets[order]
+        clash = np.zeros(len(order), dtype=bool)
+        clash[1:] = ((sorted_applicants[1:] == sorted_applicants[:-1]) &
+                     (sorted_targets[1:] == sorted_targets[:-1]))
+        if not clash.any():
+            break
+        redraw = order[clash]
+        targets[redraw] = draw_below(limits[redraw])
+
+    dense_applicants = np.flatnonzero(dense)
+    if len(dense_applicants):
+        dense_counts = counts[dense_applicants]
+        dense_targets = [rnd.sample(range(n), count) for n, count in
+                         zip(n_vacancies[dense_applicants].tolist(),
+                             dense_counts.tolist())]
+        applicants = np.concatenate(
+            [applicants, np.repeat(dense_applicants, dense_counts)])
+        targets = np.concatenate([targets] + [np.array(t, dtype=np.int64)
+                                              for t in dense_targets])
+    return applicants, targets
+
+
+def draw_below(limits):
+    """
+    Draw an integer uniformly from range(limit) for each of limits
+    """
+    return (nprnd.random_sample(len(limits)) * limits).astype(np.int64)
+
+
+def floor_windows(experience, exp_max):
+    """
+    The experience floors (in days) of the vacancies open to jobseekers
+    with an array of experience (in days) are those in (lower, upper]:
+    the floor must be reached, and the jobseeker must not be more than four
+    years over it, unless the job is at the top end.
+    Vectorised version of Employment._check_eligible.
+    """
+    top_end = 365 * (exp_max - 4)
+    upper = experience
+    lower = experience - 365 * 4
+    lower = np.where(top_end < upper, np.minimum(lower, top_end), lower)
+    return lower, upper
+
+
+def segment_argmax(values, indptr):
+    """
+    Index into values of the first largest value in each (non-empty)
+    segment values[indptr[i]:indptr[i + 1]]
+    """
+    starts = indptr[:-1]
+    maxima = np.maximum.reduceat(values, starts)
+    is_max = values == np.repeat(maxima, np.diff(indptr))
+    positions = np.where(is_max, np.arange(len(values)), len(values))
+    return np.minimum.reduceat(positions, starts)
@@ -1,11 +1,18 @@
 from __future__ import division
 import random as rnd
 from math import exp
+from itertools import count
+from heapq import heappush, heappop, heapify
+from bisect import bisect_left, insort
 
 import logging
 import numpy as np
+import numpy.random as nprnd
 
-from .job import Job
+from .job import Job, JobTable
+from .job_matching import (ApplicationMatrix, OfferLedger, draw_targets,
+                           floor_windows, segment_argmax)
+from .population_store import MISSING
 
 
 logger = logging.getLogger("intergen")
@@ -14,6 +21,156 @@ logger = logging.getLogger("intergen")
 # simulation class. This is a bit of hack and needs revising.
 
 
+class EmployedWages(object):
+    """
+    Wages of the occupied jobs, keyed by job ident, allowing the lowest
+    to be found without scanning every job.
+
+    A heap of (wage, ident) pairs is kept with lazy deletion: changing or
+    removing a wage only records the current value, and heap entries that
+    no longer match are discarded when they reach the top.
+    """
+    def __init__(self):
+        self.heap = []
+        self.current = {}  # job ident -> wage of occupant
+
+    def __len__(self):
+        return len(self.current)
+
+    def set(self, ident, wage):
+        """
+        Record the wage of the occupant of job ident
+        """
+        self.current[ident] = wage
+        heappush(self.heap, (wage, ident))
+        # stop outdated entries accumulating when all wages are updated
+        if len(self.heap) > 2 * len(self.current) + 64:
+            self.heap = [(wage, ident) for ident, wage in self.current.items()]
+            heapify(self.heap)
+
+    def reset(self, idents, wages):
+        """
+        Replace all recorded wages with those of arrays idents and wages
+        """
+        self.current = dict(zip(idents.tolist(), wages.tolist()))
+        self.heap = list(zip(wages.tolist(), idents.tolist()))
+        heapify(self.heap)
+
+    def discard(self, ident):
+        """
+        Job ident is no longer occupied
+        """
+        self.current.pop(ident, None)
+
+    def min(self):
+        """
+        The lowest wage of an occupied job. Raises ValueError if there are
+        none, as min() of an empty list does.
+        """
+        heap = self.heap
+        while heap:
+            wage, ident = heap[0]
+            if self.current.get(ident) == wage:
+                return wage
+            heappop(heap)
+        raise ValueError("No occupied jobs")
+
+
+def cohort_feedback_kernel(ages, cohort_width):
+    """
+    Matrix of gaussian weights of width given by cohort_width, normalised
+    so each row sums to one. Row i gives the contribution of the relative
+    size of the cohort at each of ages to the feedback for those aged
+    ages[i].
+    """
+    var = (cohort_width / 2) ** 2
+    weights = np.exp(- (1 / var) * np.subtract.outer(ages, ages) ** 2)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+class JobPool(object):
+    """
+    A set of jobs held densely in a list, with the position of each job
+    indexed by ident, so that membership tests, additions and removals take
+    constant time. Removal moves the last job into the gap, so the order of
+    jobs is arbitrary. Jobs can be drawn uniformly at random by position.
+
+    The pool must not be changed while it is being iterated over.
+    """
+    def __init__(self, jobs=()):
+        self.jobs = []
+        self.position = {}  # job ident -> index in jobs
+        self.extend(jobs)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def __iter__(self):
+        return iter(self.jobs)
+
+    def __getitem__(self, i):
+        return self.jobs[i]
+
+    def __contains__(self, job):
+        return job.ident in self.position
+
+    def append(self, job):
+        self.position[job.ident] = len(self.jobs)
+        self.jobs.append(job)
+
+    def extend(self, jobs):
+        for job in jobs:
+            self.append(job)
+
+    def remove(self, job):
+        """
+        Remove job from the pool, raising KeyError if it is not held
+        """
+        pos = self.position.pop(job.ident)
+        last = self.jobs.pop()
+        if last is not job:
+            self.jobs[pos] = last
+            self.position[last.ident] = pos
+
+    def sample(self, k):
+        """
+        Return k jobs chosen uniformly at random without replacement
+        """
+        return rnd.sample(self.jobs, min(k, len(self.jobs)))
+
+
+class FloorIndexedPool(JobPool):
+    """
+    A JobPool that also keeps its jobs in order of experience floor, so that
+    the jobs with floors in a range can be found by bisection.
+    """
+    def __init__(self, jobs=()):
+        self.floors = []  # sorted (experience_floor, ident) pairs
+        JobPool.__init__(self, jobs)
+
+    def append(self, job):
+        JobPool.append(self, job)
+        insort(self.floors, (job.experience_floor, job.ident))
+
+    def remove(self, job):
+        JobPool.remove(self, job)
+        del self.floors[bisect_left(self.floors,
+                                    (job.experience_floor, job.ident))]
+
+    def floor_array(self):
+        """
+        The experience floors of the jobs, in increasing order
+        """
+        return np.array([floor for floor, _ in self.floors])
+
+    def positions_of_sorted(self, indices):
+        """
+        Positions in the pool of the jobs at indices in floor order
+        """
+        return np.array([self.position[self.floors[i][1]]
+                         for i in indices.tolist()], dtype=np.int64)
+
+
 class LabourMarket(object):
     """
     class controling the labourmarket behaviour of the population
@@ -23,11 +180,22 @@ class LabourMarket(object):
     def __init__(self, params, num_jobs, timestepper):
         self.params = params
 
-        self.joblist = [Job(self, params) for _ in range(num_jobs)]
-        # we want a list of vacant jobs, which initially is all of them
-        self.vacancies = [job for job in self.joblist]
+        self.job_ids = count()
+        self.employed_wages = EmployedWages()
+        self.job_table = JobTable(num_jobs)
+        self.joblist = JobPool()
+        # we want a pool of vacant jobs, which initially is all of them
+        if params["experience_floor"]:
+            self.vacancies = FloorIndexedPool()
+        else:
+            self.vacancies = JobPool()
+        self.add_jobs(num_jobs)
 
         self.new_vacancies = []
+        # applications made this timestep, awaiting send_offers
+        self.applications = None
+        # offers made this timestep, awaiting resolve_offers
+        self.offers = OfferLedger()
 
         self.job_count = []
 
@@ -37,6 +205,10 @@ class LabourMarket(object):
 
         self.feedback_coefs = []
         self.working_ages = np.arange(15, 70)
+        self.feedback_kernel = cohort_feedback_kernel(self.working_ages,
+                                                      params["cohort_width"])
+        # relative cohort sizes the feedback_coefs were computed from
+        self.feedback_sizes = None
 
         # the below will work only if you ignore the first arg.
         # it is an object that happens to be a function,
@@ -46,23 +218,18 @@ class LabourMarket(object):
         # self.prod_function = get_productivity_function(params)
 
     def update_feedbacks(self, relative_sizes):
-
-        working_birth_years = self.timestepper.date.year - self.working_ages
-        
-        feedbacks = [self._update_feedback_single(year, relative_sizes,
-                     working_birth_years) for year in working_birth_years]
-        # we want feedback coefficients that are negative for big cohorts
-        # but positive for larger cohorts.
-        self.feedback_coefs = feedbacks
-
-    def _update_feedback_single(self, year, relative_sizes, working_birth_years):        
-        cohort_width = self.params["cohort_width"]
-        var = (cohort_width / 2) ** 2
-        weights = np.exp(- (1 / var) *
-                         (working_birth_years - year) ** 2)
-        feedback = (1 / np.sum(weights)) * relative_sizes.dot(weights)
-        return feedback
-
+        """
+        Set the wage feedback coefficient of each working age from the
+        relative sizes of the cohorts of working age, smoothed by the cohort
+        feedback kernel. These are negative for big cohorts and positive for
+        small ones. Nothing is recomputed if the relative sizes are unchanged
+        (e.g. within a year for shorter timesteps).
+        """
+        if (self.feedback_sizes is not None and
+                np.array_equal(relative_sizes, self.feedback_sizes)):
+            return
+        self.feedback_sizes = np.array(relative_sizes)
+        self.feedback_coefs = self.feedback_kernel.dot(relative_sizes)
 
     def update_jobs(self, pop):
         """
@@ -83,16 +250,55 @@ class LabourMarket(object):
                 self.params["year_length"])
         churn = int(round(mult * self.params["churn"] * len(self.joblist)))
         if churn:
-            self.shed_jobs(min(churn, len(self.joblist)))
-            self.add_jobs(churn)
+            self.churn_jobs(min(churn, len(self.joblist)))
 
         self.update_feedbacks(pop.get_relative_cohort_sizes("Male"))
-        for job in self.joblist:
-            job.update_wage(pop)
+        self.update_wages(pop)
 
         logging.info("time = {}, number of jobs = {}".format(self.timestepper.date,
                                                              len(self.joblist)))
 
+    def update_wages(self, pop):
+        """
+        Recompute the wages of the occupants of all jobs at once, reading
+        their attributes from the population store.
+        Vectorised version of Job.update_wage.
+        """
+        occupant_ids = self.job_table.column("occupant_id")
+        occupied = occupant_ids != MISSING
+        rows = pop.store.rows_of(occupant_ids[occupied])
+        wages = self.calc_wages(pop.store.experience[rows],
+                                pop.store.skill[rows],
+                                pop.store.age_years[rows],
+                                self.job_table.column("difficulty")[occupied])
+        pop.store.wage[rows] = wages
+        self.employed_wages.reset(self.job_table.column("ident")[occupied],
+                                  wages)
+
+    def calc_wages(self, experience, skill, ages, difficulty):
+        """
+        Wages for arrays of employee attributes and job difficulties, as
+        given for one employee by Job.calc_wage
+        """
+        return (self.calc_prods(experience, skill, difficulty) *
+                self.wage_multipliers(ages))
+
+    def calc_prods(self, experience, skill, difficulty):
+        """
+        Productivity for arrays of employee attributes and job difficulties,
+        as given for one employee by Job.get_prod
+        """
+        prod = self.prod_function(experience, skill, difficulty)
+        return prod * self.growth_mult + self.additive_growth
+
+    def wage_multipliers(self, ages):
+        """
+        Cohort size feedback on wages for an array of ages, as given for one
+        employee by Job.get_multiplier
+        """
+        feedback = self.feedback_coefs[ages - 15]
+        return np.exp(feedback * self.params["wage_feedback_mult"])
+
     def update_growth_coefs(self):
         self.growth_mult *= exp(self.params["growth_rate"])
         self.additive_growth += self.params["linear_growth"]
@@ -118,17 +324,55 @@ class LabourMarket(object):
         # or some other criterion of choice here
         # or high wage, close to retirement
 
-        [job.make_redundant() for job in
-         rnd.sample(self.joblist, adjustment)]
+        [job.make_redundant() for job in self.joblist.sample(adjustment)]
 
     def add_jobs(self, adjustment):
         """
         add jobs to adjust to changing size of economy
         """
-        new_jobs = [Job(self, self.params) for _ in range(adjustment)]
+        difficulty, floors = self.draw_job_attributes(adjustment)
+        new_jobs = [Job(self, self.params, job_difficulty, floor)
+                    for job_difficulty, floor in zip(difficulty.tolist(),
+                                                     floors.tolist())]
         self.joblist.extend(new_jobs)
         self.vacancies.extend(new_jobs)
 
+    def churn_jobs(self, n):
+        """
+        Replace n randomly chosen jobs with new ones. The job objects and
+        their rows of the job table are reused: occupants lose their jobs,
+        and difficulties and experience floors are drawn afresh for the
+        whole batch at once, so that no jobs are created.
+        """
+        jobs = self.joblist.sample(n)
+        for job in jobs:
+            if job.occupant:
+                job.occupant.job = None
+                job.occupant = None
+                self.employed_wages.discard(job.ident)
+            else:
+                # leave the pool while the experience floor changes
+                self.vacancies.remove(job)
+        rows = np.array([job._row for job in jobs], dtype=np.int64)
+        difficulty, floors = self.draw_job_attributes(len(jobs))
+        self.job_table.difficulty[rows] = difficulty
+        self.job_table.experience_floor[rows] = floors
+        self.vacancies.extend(jobs)
+
+    def draw_job_attributes(self, n):
+        """
+        Draw the difficulty and experience floor (zero unless used) for n
+        new jobs
+        """
+        difficulty = nprnd.random_sample(n) * self.difficulty_bound()
+        if self.params["experience_floor"]:
+            floors = (np.maximum(0, nprnd.uniform(-15, self.params["exp_max"],
+                                                  n)) *
+                      self.params["year_length"])
+        else:
+            floors = np.zeros(n)
+        return difficulty, floors
+
     def expected_job_value(self):
         """
         Calculate what it is expected that a new job might produce
@@ -172,12 +416,90 @@ class LabourMarket(object):
     #                 delta * experience_years**2))  # experience contribution
     #     return prod
 
+    def take_applications(self, pop, rows):
+        """
+        Draw the applications of the jobseekers at store rows to vacancies,
+        for all of them at once, to be processed by send_offers.
+        Vectorised version of Employment.apply_for_jobs.
+        """
+        mult = (self.timestepper.get_timestep_days() /
+                self.params["year_length"])
+        employed = pop.store.job_id[rows] != MISSING
+        rates = np.where(employed, self.params["job_apps_employed"],
+                         self.params["job_apps_unemployed"])
+        counts = nprnd.poisson(rates * mult)
+        if self.params["experience_floor"]:
+            # each jobseeker draws from the window of vacancies, in order of
+            # experience floor, that are open to them
+            floors = self.vacancies.floor_array()
+            lower, upper = floor_windows(pop.store.experience[rows],
+                                         self.params["exp_max"])
+            starts = np.searchsorted(floors, lower, side="right")
+            ends = np.searchsorted(floors, upper, side="right")
+            applicants, offsets = draw_targets(counts, ends - starts)
+            targets = self.vacancies.positions_of_sorted(starts[applicants] +
+                                                         offsets)
+        else:
+            applicants, targets = draw_targets(counts, len(self.vacancies))
+        self.applications = ApplicationMatrix(rows[applicants], targets,
+                                              self.vacancies)
+
+    def choose_winners(self, pop):
+        """
+        Choose the best applicant to each vacancy applied to, according to
+        the app_criteria parameter. Returns the idents of the jobs offered,
+        the store rows of the applicants chosen, and the wages offered.
+        Vectorised version of Job._pick_winner.
+        """
+        apps = self.applications
+        if apps is None or not len(apps):
+            return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                    np.zeros(0))
+        store = pop.store
+        difficulty = np.repeat(self.job_table.difficulty[apps.job_rows],
+                               apps.counts())
+        prods = self.calc_prods(store.experience[apps.rows],
+                                store.skill[apps.rows], difficulty)
+        wages = prods * self.wage_multipliers(store.age_years[apps.rows])
+        criteria = self.params["app_criteria"]
+        if criteria == "wage":
+            best = segment_argmax(wages, apps.indptr)
+            offered = wages[best] >= 0
+        elif criteria == "prod":
+            best = segment_argmax(prods, apps.indptr)
+            offered = prods[best] >= 0
+        elif criteria == "profit":
+            best = segment_argmax(prods - wages, apps.indptr)
+            offered = np.ones(len(best), dtype=bool)
+        else:
+            raise ValueError("dont recognise app_criteria")
+        job_ids = self.job_table.ident[apps.job_rows[offered]]
+        return job_ids, apps.rows[best[offered]], wages[best[offered]]
+
     def send_offers(self, pop):
         """
-        Process applications to each job, and send offers as appropriate
+        Process the applications taken this timestep, and record an offer
+        to the best applicant to each vacancy, where suitable.
+        Job.offer_job is the per-job reference version.
+        """
+        job_ids, rows, wages = self.choose_winners(pop)
+        self.offers.record(pop.store.ident[rows], job_ids, wages)
+        self.applications = None
+
+    def resolve_offers(self, pop):
+        """
+        Each agent offered a job takes the best of their offers, if better
+        than any job they hold.
+        Employment.assess_offers is the per-agent reference version.
         """
-        for job in self.vacancies:
-            job.offer_job(pop)
+        best = self.offers.best_offers()
+        agents = pop.store.agents[pop.store.rows_of(self.offers.agent_ids[best])]
+        jobs = self.job_table.agents[
+            self.job_table.rows_of(self.offers.job_ids[best])]
+        for agent, job, wage in zip(agents, jobs,
+                                    self.offers.wages[best].tolist()):
+            agent.employment.accept_offer(job, wage)
+        self.offers.clear()
 
     def process_new_vacancies(self):
         """
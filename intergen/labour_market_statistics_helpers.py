@@ -42,7 +42,7 @@ def get_job_difficulty_distribution(labour_market):
             if job.occupant]
 
 def get_experience_distribution(labour_market):
-    return [job.occupant.agent.experience.days / labour_market.params["year_length"]
+    return [job.occupant.agent.experience / labour_market.params["year_length"]
             for job in labour_market.joblist if job.occupant]
 
 def get_age_wage_distribution(labour_market):
@@ -0,0 +1,153 @@
+"""
+Marriage market queues, indexed to allow quick partner selection.
+"""
+from __future__ import division
+import random as rnd
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from .utils import year_from_ordinal
+
+
+class MarriageMarket(object):
+    """
+    The agents of one sex currently looking for a partner.
+
+    Members are kept in order of arrival, in a flat list allowing uniform
+    random sampling, and in buckets by year of birth holding (skill, ident)
+    pairs sorted by skill. Age in years is always either the current year
+    minus the birth year or one less, so birth year buckets stay valid as
+    members age, whatever the length of the timestep; an age window becomes
+    a range of birth years when the market is searched. Removal of a member
+    does not require a scan of the market.
+    """
+    def __init__(self, timestepper):
+        self.timestepper = timestepper
+        self.members = {}  # ident -> agent, in order of arrival
+        self.slots = []  # agents, in arbitrary order, for sampling
+        self.slot_of = {}  # ident -> position in slots
+        self.buckets = defaultdict(list)  # birth year -> sorted (skill, ident)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        # iterate over a copy so members can be removed along the way
+        return iter(list(self.members.values()))
+
+    def __contains__(self, agent):
+        return agent.ident in self.members
+
+    def append(self, agent):
+        """
+        Add agent to the back of the queue
+        """
+        birth_year = self._add(agent)
+        insort(self.buckets[birth_year], (agent.skill, agent.ident))
+
+    def extend(self, agents):
+        """
+        Add several agents, sorting each affected bucket once
+        """
+        touched = set()
+        for agent in agents:
+            birth_year = self._add(agent)
+            self.buckets[birth_year].append((agent.skill, agent.ident))
+            touched.add(birth_year)
+        for birth_year in touched:
+            self.buckets[birth_year].sort()
+
+    def remove(self, agent):
+        """
+        Remove agent from the market
+        """
+        ident = agent.ident
+        del self.members[ident]
+
+        # swap the last slot into the gap
+        pos = self.slot_of.pop(ident)
+        last = self.slots.pop()
+        if last is not agent:
+            self.slots[pos] = last
+            self.slot_of[last.ident] = pos
+
+        birth_year = year_from_ordinal(agent.DOB)
+        bucket = self.buckets[birth_year]
+        del bucket[bisect_left(bucket, (agent.skill, ident))]
+        if not bucket:
+            del self.buckets[birth_year]
+
+    def sample(self, k):
+        """
+        Return k members chosen uniformly at random without replacement
+        """
+        return rnd.sample(self.slots, min(k, len(self.slots)))
+
+    def best_match(self, skill, target_age, age_cost):
+        """
+        Find the member minimising
+            abs(member.skill - skill) + age_cost(member.age_years)
+        where age_cost does not decrease with distance from target_age.
+
+        Those aged target_age were born in one of two years. Birth year
+        buckets are visited outwards from these, stopping once the lowest
+        age cost in a bucket alone exceeds the best score found. Within a
+        bucket members are visited outwards from the closest skill, until
+        the difference in skill rules out the rest.
+        """
+        if not self.members:
+            return None
+        year = self.timestepper.date.year
+        # bucket year - target_age + offset holds those aged
+        # target_age - offset and target_age - offset - 1
+        newest = year - target_age
+        max_offset = max(max(self.buckets) - newest,
+                         newest - 1 - min(self.buckets))
+        best, best_score = None, float("inf")
+        for offset in range(max_offset + 1):
+            searched = False
+            for birth_year in (newest + offset, newest - 1 - offset):
+                age = year - birth_year
+                bound = min(age_cost(age), age_cost(age - 1))
+                if bound >= best_score:
+                    continue
+                searched = True
+                bucket = self.buckets.get(birth_year)
+                if bucket:
+                    best, best_score = self._search_bucket(
+                        bucket, skill, bound, age_cost, best, best_score)
+            if not searched:
+                break
+        return self.members[best]
+
+    def _search_bucket(self, bucket, skill, bound, age_cost, best,
+                       best_score):
+        """
+        Improve on the best ident and score found with members of a bucket
+        whose lowest age cost is bound
+        """
+        right = bisect_left(bucket, (skill,))
+        left = right - 1
+        while left >= 0 or right < len(bucket):
+            # take whichever neighbour is closer in skill
+            if right >= len(bucket) or (
+                    left >= 0 and
+                    skill - bucket[left][0] <= bucket[right][0] - skill):
+                member_skill, ident = bucket[left]
+                left -= 1
+            else:
+                member_skill, ident = bucket[right]
+                right += 1
+            skill_distance = abs(member_skill - skill)
+            if skill_distance + bound >= best_score:
+                break
+            score = skill_distance + age_cost(self.members[ident].age_years)
+            if score < best_score:
+                best, best_score = ident, score
+        return best, best_score
+
+    def _add(self, agent):
+        self.members[agent.ident] = agent
+        self.slot_of[agent.ident] = len(self.slots)
+        self.slots.append(agent)
+        return year_from_ordinal(agent.DOB)
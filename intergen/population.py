@@ -3,8 +3,7 @@ Class representing populations of agents
 """
 from __future__ import division
 import random as rnd
-from math import exp
-from collections import Counter
+from collections import defaultdict
 
 import logging
 
@@ -12,8 +11,18 @@ import numpy.random as nprnd
 import numpy as np
 
 from .agent import Male, Female
+from .population_store import MISSING
+from .marriage_market import MarriageMarket
+from .birth_counts import BirthCounts
 
-from .utils import gompertz_mortality_fact
+from .utils import (gompertz_mortality_fact, age_years_from_ordinal,
+                    age_years_from_ordinals, year_from_ordinal,
+                    years_from_ordinals)
+
+# women of higher parity are not given further children at setup
+MAX_SETUP_PARITY = 5
+# ages whose birth cohorts are compared in relative cohort sizes
+WORKING_AGES = np.arange(15, 70)
 
 class BasePopulation(object):
     """
@@ -37,19 +46,36 @@ class Population(BasePopulation):
         self.sim = sim
         self.agent_factory = agent_factory
 
-        self.marriage_market_males = []
-        self.marriage_market_females = []
+        self.marriage_market_males = MarriageMarket(agent_factory.timestepper)
+        self.marriage_market_females = MarriageMarket(agent_factory.timestepper)
 
         self.initial_pop_size = params["pop_size"]
         self.pop_size = self.initial_pop_size
 
+        # columns for living agents are filled by the agent factory,
+        # dead agents are moved to an append-only store.
+        self.store = agent_factory.store
+        self.dead_store = agent_factory.dead_store
+        self.genealogy = agent_factory.genealogy
+
         self.poplist = [agent_factory.make_initial_agent()
                         for _ in range(self.initial_pop_size)]
-
-        self.relative_cohort_size_m = None
-        self.relative_cohort_size_f = None
+        # thereafter kept up to date as agents change status
+        self.jobseekers = agent_factory.jobseekers
+        ages = self.store.column("age_years")
+        eligible = self.eligible_for_market(ages, self.store.column("female"))
+        self.jobseekers.add(self.store.column("ident")[eligible],
+                            self.store.column("job_id")[eligible] != MISSING)
+
+        # relative cohort sizes are computed when first needed, and kept
+        # until the year moves on or the birth counts change.
+        self.cohort_year = None
+        self.cohort_size_cache = {}
 
         self.benefit_level = self.params["social_security_level"]
+
+        # demographic rates by age, shared with the agents
+        self.hazards = agent_factory.hazards
     #  setup functions --------------------------------------------
 
     def setup_cohort_sizes(self):
@@ -62,9 +88,7 @@ class Population(BasePopulation):
             # Do child classes definitely inherit changes in parent class atts?
         self.female_birth_ts = self.construct_birth_ts(Female)
         self.male_birth_ts = self.construct_birth_ts(Male)
-        year = self.poplist[1].timestepper.date.year
-        self.relative_cohort_size_m = self.calc_relative_cohort_sizes(year, "Male")
-        self.relative_cohort_size_f = self.calc_relative_cohort_sizes(year, "Female")
+        self.cohort_year = self.agent_factory.timestepper.date.year
 
 
     def do_partnership_setup(self):
@@ -73,40 +97,55 @@ class Population(BasePopulation):
         and women have a roughly sensible distribution of children
         chosen from the distribution in the sample
         """
-        males = [agent for agent in self.poplist
-                 if partnerable(agent) and isinstance(agent, Male)]
-        females = [agent for agent in self.poplist
-                   if partnerable(agent) and isinstance(agent, Female)]
-        children = [agent for agent in self.poplist if not partnerable(agent)]
-
-        for female in females:
-            if rnd.random() < self.setup_marriage_dist(female.age_years) \
-                        and males:
-                p_i = self.pick_partner(female, males)
-                self.partner_agents(males[p_i], female)
-                del males[p_i]
+        ages = self.store.column("age_years")
+        female = self.store.column("female")
+        agents = self.store.live_agents()
+        adult = ages > 16
+        # who is partnered is drawn for all women at once; each is then
+        # matched to the most suitable remaining man by age and skill.
+        marrying = adult & female & (nprnd.random_sample(len(ages)) <
+                                     self.setup_marriage_dist(ages))
+        children = list(agents[~adult])
+
+        males = MarriageMarket(self.agent_factory.timestepper)
+        males.extend(agents[adult & ~female])
+        wives = agents[marrying]
+        nprnd.shuffle(wives)
+        for wife in wives:
+            if not males:
+                break
+            husband = self.nearest_mate(wife, males)
+            males.remove(husband)
+            self.partner_agents(husband, wife)
 
         logging.debug("Completed partnering...")
 
         # TODO: Should this go somewhere else? In fertility?
         self.assign_children(children,
-                             [female for female in females
-                              if female.partner and female.age_years < 55])
+                             [wife for wife in wives
+                              if wife.have_partner() and wife.age_years < 55])
 
     def construct_birth_ts(self, sex):
         """
         Aims to construct an approximation to the historical birth time series
         at startup, by inflating current agents by inverse of survivorship.
         """
-        birth_ts = Counter()
         gomp = self.get_gompertz()
         ages = np.arange(100)
         inflators = 1/np.cumprod([1-gomp(age) for age in ages])
-        for agent in self.poplist:
-            if isinstance(agent, sex):
-                birth_ts[agent.DOB.year] += 1 * inflators[agent.age_years]
+        of_sex = self.store.column("female") == (sex is Female)
+        birth_ts = BirthCounts(self.agent_factory.timestepper.date.year)
+        birth_ts.add_many(years_from_ordinals(self.store.column("DOB")[of_sex]),
+                          inflators[self.store.column("age_years")[of_sex]])
         return birth_ts
 
+    def record_birth(self, child):
+        """
+        Add a birth to the time series for the sex of child
+        """
+        birth_ts = self.female_birth_ts if child.isfemale else self.male_birth_ts
+        birth_ts.add(year_from_ordinal(child.DOB))
+
     def get_gompertz(self):
         a = self.params["gompertz_a"]
         b = self.params["gompertz_b"]
@@ -122,79 +161,108 @@ class Population(BasePopulation):
         a = self.params["setup_marriage_age_a"]
         b = self.params["setup_marriage_age_b"]
         mid = self.params["setup_marriage_age_mid"]
-        return 1 - exp(- exp(a + b * (age - mid)))
+        return 1 - np.exp(- np.exp(a + b * (age - mid)))
 
     def assign_children(self, children, females):
         """
         Assign children to mother for setup.
         difficult, as need to respect possible age and parity distributions
+
+        Prospective mothers are held in buckets of equal (age, parity), all of
+        whom are equally likely to be the mother of a given child. Children
+        are assigned oldest first, so that parities build up in birth order.
+        All children of one age are spread over the buckets in a single
+        weighted draw; each mother chosen takes one child and moves to the
+        bucket of the next parity, and any children left over because a
+        bucket ran out of mothers go to the next draw.
         """
-        logging.debug("Assigning {} children"
-                      "to {} mothers".format(len(children), len(females)))
-        childno = 1
         prospective_mothers = [ma for ma in females
                                if ma.fertility.check_family_formation(self)]
+        logging.debug("Assigning {} children to {} "
+                      "mothers".format(len(children),
+                                       len(prospective_mothers)))
+        original_parity = [mother.fertility.parity
+                           for mother in prospective_mothers]
+        parity = list(original_parity)
+        first_birth = [mother.fertility.date_of_first_birth
+                       for mother in prospective_mothers]
+        last_birth = [mother.fertility.date_of_last_birth
+                      for mother in prospective_mothers]
+        buckets = defaultdict(list)  # (age, parity) -> mother indices
+        for i, mother in enumerate(prospective_mothers):
+            if parity[i] <= MAX_SETUP_PARITY:
+                buckets[(mother.age_years, parity[i])].append(i)
+
+        children_by_age = defaultdict(list)
         for child in children:
-            check_not_forever = 0
-            while not child.mother and check_not_forever < 20:
-                self.pick_mother(child, prospective_mothers)
-                check_not_forever += 1
-
-            logging.debug("Assigning child {} of {} children".format(childno,
-                                                               len(children)))
-            if check_not_forever == 20:
-                logging.debug("Child {} not assigned ".format(childno))
-            childno += 1
-
-    def pick_mother(self, child, females):
-        """
-        assign a child to a mother based weighting function matching_children
+            children_by_age[child.age_years].append(child)
+
+        unassigned = 0
+        for child_age in sorted(children_by_age, reverse=True):
+            waiting = children_by_age[child_age]
+            while waiting:
+                keys = [key for key, bucket in buckets.items() if bucket]
+                weights = np.array([len(buckets[age, par]) *
+                                    self.matching_children(age - child_age,
+                                                           par)
+                                    for age, par in keys])
+                total = weights.sum() if keys else 0
+                if not total > 0:
+                    break
+                draws = nprnd.multinomial(len(waiting), weights / total)
+                promoted = []
+                for key, n_children in zip(keys, draws):
+                    for i in self.pop_mothers(buckets[key], n_children):
+                        child = waiting.pop()
+                        mother = prospective_mothers[i]
+                        self.genealogy.add_child(mother, child)
+                        parity[i] += 1
+                        if first_birth[i] == MISSING:
+                            first_birth[i] = child.DOB
+                        last_birth[i] = max(last_birth[i], child.DOB)
+                        if parity[i] <= MAX_SETUP_PARITY:
+                            promoted.append(((key[0], parity[i]), i))
+                # mothers become available at their new parity next draw
+                for key, i in promoted:
+                    buckets[key].append(i)
+            unassigned += len(waiting)
+        if unassigned:
+            logging.debug("{} children not assigned".format(unassigned))
+
+        for i, mother in enumerate(prospective_mothers):
+            if parity[i] > original_parity[i]:
+                mother.fertility.parity = parity[i]
+                mother.fertility.date_of_first_birth = first_birth[i]
+                mother.fertility.date_of_last_birth = last_birth[i]
+
+    @staticmethod
+    def pop_mothers(bucket, n):
+        """
+        Remove and return up to n mothers chosen at random from bucket
+        """
+        n = min(n, len(bucket))
+        chosen = []
+        for _ in range(n):
+            j = rnd.randrange(len(bucket))
+            bucket[j], bucket[-1] = bucket[-1], bucket[j]
+            chosen.append(bucket.pop())
+        return chosen
+
+    def matching_children(self, age_at_birth, parity):
+        """
+        give probablity weight of a woman of the given parity being mother to
+        a child born at age_at_birth in the initial population. arbitrary.
         """
-        try:
-            num_choices = min(len(females), 10)
-            prospective_mothers = rnd.sample(females, num_choices)
-        except ValueError:
-            return
-        logging.debug("choosing from {}"
-                      " prospective_mothers".format(len(prospective_mothers)))
-        weights = [self.matching_children(child, prosp_mo) for prosp_mo
-                   in prospective_mothers]
-        if not sum(weights) > 0:
-            logging.debug("No suitable mothers")
-            return
-        probs = [weight / sum(weights) for weight in weights]
-        mother = nprnd.choice(prospective_mothers, 1, p=probs)[0]
-        mother.fertility.parity += 1
-        if not mother.children:
-            mother.fertility.date_of_last_birth = child.DOB
-        else:
-            most_recent_other_birth = max([other_child.DOB for other_child in mother.children])
-            mother.fertility.date_of_last_birth = max(most_recent_other_birth, child.DOB)
-        #logging.debug("mother-child match, partners_wage {}".format(mother.partner.employment.get_wage()))
-        mother.children.append(child)
-        child.mother = mother
-
-    def matching_children(self, child, female):
-        """
-        give probablity weight of female being mother to child in the initial
-        population. arbitrary.
-        """
-        age_at_birth = female.age_years - child.age_years
-        logging.debug("Prospective mother's age at birth"
-                      " = {}".format(age_at_birth))
-
         if age_at_birth < 17 or age_at_birth > 45:
             weight = 0
-        elif female.fertility.parity > 5:
-            weight = 0
-        elif not female.fertility.check_family_formation(self):
+        elif parity > MAX_SETUP_PARITY:
             weight = 0
         elif age_at_birth > 22 and age_at_birth < 32:
             weight = 1
         else:
             weight = 0.2
-        if female.fertility.parity > 1:
-            weight = weight / female.fertility.parity
+        if parity > 1:
+            weight = weight / parity
         return weight
 
     # timestep functions -----------------------------------------------
@@ -205,59 +273,189 @@ class Population(BasePopulation):
         includes anything defined in the step activity method (e.g. fertility)
         And additionally mortality
         """
-        # could just shuffle the poplist directly. might be slightly quicker.
-        # range in python 3 is an iterator
-        indexes = list(range(len(self.poplist)))
-        nprnd.shuffle(indexes)
-        for i in indexes:
-            self.poplist[i].step_activity(sim)
-
-        deaths = [self.check_survival_pop(i) for i in indexes]
-        for death in deaths:
-            if death:
-                death.die(self)
-        year = sim.timestepper.date.year
-        self.relative_cohort_size_m = self.calc_relative_cohort_sizes(year, "Male")
-        self.relative_cohort_size_f = self.calc_relative_cohort_sizes(year, "Female")
+        self.hazards.refresh()
+        self.update_ages(sim.timestepper)
+        self.lifecycle_stage(sim.timestepper)
+        # only agents with something to do in step_activity are visited,
+        # in random order
+        active = self.store.live_agents()[self.active_rows()]
+        nprnd.shuffle(active)
+        for agent in active:
+            agent.step_activity(sim)
+
+        dead_rows = self.mortality_stage(sim.timestepper)
+        self.remove_dead(list(self.store.agents[dead_rows]))
+        self.cohort_year = sim.timestepper.date.year
         # if self.params["fertility_type"] == "simple_fertility":
         #     # possiblity to restrict to males, the employed etc
         #     self.female_age_dist = get_age_distribution(self)
 
+    def update_ages(self, timestepper):
+        """
+        Recalculate ages in years from dates of birth, and accrue experience
+        for those in work, for the whole population at once.
+        """
+        ages = self.store.column("age_years")
+        new_ages = age_years_from_ordinals(self.store.column("DOB"),
+                                           timestepper.date)
+        aged = np.flatnonzero(new_ages != ages)
+        self.update_jobseekers(aged, ages[aged], new_ages[aged])
+        ages[aged] = new_ages[aged]
+        self.store.recount(aged)
+        employed = self.store.column("job_id") != MISSING
+        self.store.column("experience")[employed] += \
+            timestepper.get_timestep_days()
+
+    def update_jobseekers(self, rows, old_ages, new_ages):
+        """
+        Register the agents at rows who become eligible for the labour
+        market as their age changes, and remove those who cease to be
+        """
+        female = self.store.female[rows]
+        was_eligible = self.eligible_for_market(old_ages, female)
+        now_eligible = self.eligible_for_market(new_ages, female)
+        idents = self.store.ident[rows]
+        for ident in idents[was_eligible & ~now_eligible].tolist():
+            self.jobseekers.discard(ident)
+        entering = now_eligible & ~was_eligible
+        self.jobseekers.add(idents[entering],
+                            self.store.job_id[rows[entering]] != MISSING)
+
+    def eligible_for_market(self, ages, female):
+        """
+        Which agents, given arrays of their ages and sex, are eligible for
+        the labour market. Vectorised version of
+        Employment.eligible_for_market.
+        """
+        return (~female & (ages > 16) &
+                (ages < self.params["retirement_age"]))
+
+    def lifecycle_stage(self, timestepper):
+        """
+        Find, for the whole population at once, the agents making a
+        transition as they age: reaching imprinting time, reaching retirement
+        age while in work, being eligible to search for a partner, or ageing
+        out of the marriage market. Only those agents are then visited.
+        """
+        ages = self.store.column("age_years")
+        has_job = self.store.column("job_id") != MISSING
+        single = self.store.column("partner_id") == MISSING
+        agents = self.store.live_agents()
+
+        imprinting = ((ages >= self.params["imprinting_time"]) &
+                      ~self.store.column("imprinted"))
+        retiring = (ages >= self.params["retirement_age"]) & has_job
+        in_market = self.store.column("in_marriage_market")
+        max_age = self.params["marriage_market_max_age"]
+        # no one ages out of the marriage market unless a limit is set
+        too_old = ages > (np.inf if max_age is None else max_age)
+        searching = (ages > 16) & ~too_old & single & ~in_market
+        ageing_out = too_old & in_market
+
+        for agent in agents[imprinting]:
+            agent.aspiration = agent.determine_aspiration(self)
+        for agent in agents[retiring]:
+            agent.employment.job.retire()
+        for agent in agents[ageing_out]:
+            self.leave_marriage_market(agent)
+        self.partnering_stage(np.flatnonzero(searching), timestepper)
+
+    def partnering_stage(self, rows, timestepper):
+        """
+        Decide which of the agents in rows (single adults not yet in the
+        marriage market) enter the marriage market this timestep, and add
+        them to the male and female markets.
+        Vectorised version of Agent.find_partner.
+        """
+        hazards = self.hazards.partnering_step[
+            self.hazards.index(self.store.age_years[rows])]
+        entering = rows[nprnd.random_sample(len(rows)) < hazards]
+        nprnd.shuffle(entering)
+
+        self.store.in_marriage_market[entering] = True
+        female = self.store.female[entering]
+        agents = self.store.agents[entering]
+        self.marriage_market_females.extend(agents[female])
+        self.marriage_market_males.extend(agents[~female])
+
+    def active_rows(self):
+        """
+        Rows of agents for whom step_activity does anything this timestep:
+        women of reproductive age, plus working men if wages are logged.
+        """
+        ages = self.store.column("age_years")
+        female = self.store.column("female")
+        active = female & (ages > 15) & (ages < 49)
+        if self.params["log_wages"]:
+            active |= ~female & (self.store.column("job_id") != MISSING)
+        return np.flatnonzero(active)
+
     # economic functions ------------------------------------------------
 
     def do_applications(self, sim):
-        for agent in self.poplist:
-            agent.employment.activity(sim)
+        """
+        Jobseekers apply for vacancies, all at once.
+        Employment.activity is the per-agent reference version.
+        """
+        sim.get_labour_market().take_applications(self, self.jobseeker_rows())
+
+    def jobseeker_rows(self):
+        """
+        Rows of the agents looking for work: men of working age without a
+        job (see Employment.participate_in_market). These are read from the
+        JobseekerRegistry rather than found by scanning the population.
+        """
+        return self.store.rows_of(self.jobseekers.unemployed.idents())
 
     def update_social_security(self):
-        
-        wages = [agent.employment.wage for agent in self.poplist 
-                 if agent.employment.have_job()]
-        try:
-            min_wage = min(wages)
-        except ValueError:
-            if not wages:
-                min_wage = 0
-            else:
-                raise ValueError("Noticed somethings not right while trying to"
-                                  "uprate benefit level.")
+        # lowest wage among the employed, tracked by the labour market
+        wages = self.sim.get_labour_market().employed_wages
+        min_wage = wages.min() if wages else 0
         self.benefit_level = max(self.benefit_level, min_wage)
         #mult = exp(self.params["growth_rate"])
         #addit  = self.params["linear_growth"]
         #self.benefit_level *= mult
         #self.benefit_level += addit * 0.8
 
+    def remove_dead(self, deaths):
+        """
+        Remove the agents that died this timestep.
+        Each agent releases its own job and store row, then poplist is
+        compacted in a single pass rather than one list.remove per death.
+        """
+        if not deaths:
+            return
+        for agent in deaths:
+            agent.die(self)
+        dead = set(deaths)
+        self.poplist[:] = [agent for agent in self.poplist
+                           if agent not in dead]
+
+    def mortality_stage(self, timestepper):
+        """
+        Determine who dies during the timestep, for the whole population at
+        once. Returns the store rows of the agents who die.
+        Agent.check_survival is the per-agent reference implementation.
+        """
+        ages = self.store.column("age_years")
+        hazards = self.hazards.mortality_step[self.hazards.index(ages)]
+        draws = nprnd.random_sample(len(ages))
+        return np.flatnonzero(draws < hazards)
+
     def check_survival_pop(self, index):
         """
         check if the agent referred to by index survives the time period
+        (reference implementation, see mortality_stage)
         """
         return self.poplist[index].check_survival()
 
     def derive_demand(self):
         """
         sum the demand contribution of all agents
+        (read from the status histogram, see Agent.demand_contribution)
         """
-        return sum(agent.demand_contribution() for agent in self.poplist)
+        counts = self.store.histogram.by_age()
+        return counts.dot(demand_contributions(np.arange(len(counts))))
 
     def skill_distribution(self):
         """
@@ -268,15 +466,23 @@ class Population(BasePopulation):
 
     def get_lab_force_size(self):
         # may depend on women work status
-        return sum(agent.employment.eligible_for_market() for agent in
-                   self.poplist)
+        return int(self.eligible_by_age().sum())
+
+    def eligible_by_age(self):
+        """
+        Counts by age of the agents eligible for the labour market
+        (see Employment.eligible_for_market)
+        """
+        counts = self.store.histogram.by_age(female=False)
+        ages = np.arange(len(counts))
+        eligible = (ages > 16) & (ages < self.params["retirement_age"])
+        return np.where(eligible, counts, 0)
 
     def resolve_job_offers(self):
         """
-        Each agent examines their offers, and takes a job if relevant
+        Each agent offered a job takes the best offer, if relevant
         """
-        for agent in self.poplist:
-            agent.employment.assess_offers(self)
+        self.sim.get_labour_market().resolve_offers(self)
 
     # demographic functions ---------------------------------------------
 
@@ -287,53 +493,72 @@ class Population(BasePopulation):
         self.poplist.append(child)
         self.pop_size += 1
 
-    def pick_partner(self, female, malelist):
-        """
-        pick the most suitable partner for female from malelist,
-        by social distance criteria
-        return index of position of partner in malelist
-        """
-        no_indexes = min(len(malelist), 5)
-        indexes = rnd.sample(range(len(malelist)), no_indexes)
-        suitabilities = [{"value": self.matching_mate(female, malelist[index]),
-                          "index": index} for index in indexes]
-        # the lowest 'distance'
-        suitabilities.sort(key=lambda x: x["value"])
-        partner_i = suitabilities[0]["index"]
-        return partner_i
-
     def resolve_marriage_market(self):
         """
         For those scheduled to become married, record age of marriage
         """
         # should include threshold ? - but probabilistic stuff is taken care of
         # by the hazard for marriage
-        still_in_market = []
         for female in self.marriage_market_females:
             # fifo queuing for females
-            if self.marriage_market_males:
-                p_i = self.pick_partner(female, self.marriage_market_males)
-                self.partner_agents(female, self.marriage_market_males[p_i])
-                del self.marriage_market_males[p_i]
-            else:
-                still_in_market.append(female)
-        self.marriage_market_females[:] = still_in_market
+            if not self.marriage_market_males:
+                break
+            male = self.choose_mate(female, self.marriage_market_males)
+            self.leave_marriage_market(male)
+            self.leave_marriage_market(female)
+            self.partner_agents(male, female)
+
+    def leave_marriage_market(self, agent):
+        """
+        Remove agent from the marriage market, if queued there. Called when
+        an agent partners, dies or ages out, so that the markets hold only
+        living, single agents of partnering age.
+        """
+        if agent.in_marriage_market:
+            agent.get_marriage_market(self).remove(agent)
+            agent.in_marriage_market = False
+
+    def choose_mate(self, female, market):
+        """
+        Choose a partner for female from a MarriageMarket of males.
+        Depending on the marriage_search parameter, either the most suitable
+        of 5 randomly sampled males ("sample"), or the most suitable male in
+        the market ("nearest").
+        """
+        if self.params["marriage_search"] == "nearest":
+            return self.nearest_mate(female, market)
+        candidates = market.sample(5)
+        # the lowest 'distance'
+        return min(candidates, key=lambda male: self.matching_mate(female, male))
+
+    def nearest_mate(self, female, market):
+        """
+        The most suitable partner for female in a MarriageMarket of males
+        """
+        female_age = female.age_years
+        return market.best_match(
+            female.skill,
+            female_age + self.params["partner_age_diff"],
+            lambda male_age: self.age_mismatch(female_age, male_age))
 
     def matching_mate(self, female, male):
-        age_diff = abs(male.age_years - female.age_years -
-                       self.params["partner_age_diff"])
         skill_diff = abs(male.skill - female.skill)
+        return skill_diff + self.age_mismatch(female.age_years, male.age_years)
+
+    def age_mismatch(self, female_age, male_age):
+        """
+        Age component of the distance between partners used in matching_mate
+        """
+        age_diff = abs(male_age - female_age - self.params["partner_age_diff"])
         # 50 determines the relative weighting between skill and age
         # but doesn't effect age-based choices (atm)
-        return skill_diff + (age_diff ** 2) / 50
+        return (age_diff ** 2) / 50
 
     def partner_agents(self, male, female):
         """
         Ensure we can identify the relationship between male and female
         """
-        # TODO move this to agent level.
-        female.partner = male
-        male.partner = female
+        self.genealogy.partner(female, male)
         female.age_at_marriage = female.age_years
         male.age_at_marriage = male.age_years
 
@@ -342,35 +567,48 @@ class Population(BasePopulation):
         Calculate the relative sizes of all birth cohorts currently of working 
         age. Note that the size at birth is used, not the current size. 
         """
-        ages = np.arange(15, 70)
-        birth_years = year - ages
-        if sex == "Female":
-            counts = np.array([self.female_birth_ts[year] for year
-                               in birth_years])
-        elif sex =="Male":
-            counts = np.array([self.male_birth_ts[year] for year
-                               in birth_years])
-        else:
-            raise ValueError("sex must be 'Male' or 'Female'")
+        birth_years = year - WORKING_AGES
+        counts = self.get_birth_ts(sex).get(birth_years)
         relative_size = counts / np.mean(counts)
         # relative_size[birth_years < self.agent.timestepper.start_date.year] = 1
         return 1 - relative_size
 
     def get_relative_cohort_sizes(self, sex):
+        birth_ts = self.get_birth_ts(sex)
+        # births outside the cohorts read (such as those of the current year)
+        # leave the cached sizes valid
+        key = (self.cohort_year,
+               birth_ts.version_of(self.cohort_year - WORKING_AGES))
+        cached = self.cohort_size_cache.get(sex)
+        if cached is None or cached[0] != key:
+            cached = (key, self.calc_relative_cohort_sizes(self.cohort_year,
+                                                           sex))
+            self.cohort_size_cache[sex] = cached
+        return cached[1]
+
+    def get_birth_ts(self, sex):
         if sex == "Female":
-            return self.relative_cohort_size_f
+            return self.female_birth_ts
         elif sex =="Male":
-            return self.relative_cohort_size_m
+            return self.male_birth_ts
         else:
             raise ValueError("sex must be 'Male' or 'Female'")
 
 
 def age_at_first_birth(mother):
-    return mother.age_years - mother.children[0].age_years
+    return mother.age_years - age_years_from_ordinal(
+        mother.fertility.date_of_first_birth, mother.timestepper.date)
 
 
 def partnerable(agent):
     """
     examine if the agent is able to form a partnership
     """
-    return agent.age_years > 16 and not agent.partner
+    return agent.age_years > 16 and not agent.have_partner()
+
+
+def demand_contributions(ages):
+    """
+    Vectorised Agent.demand_contribution, for an array of ages in years
+    """
+    return np.select([ages < 16, ages < 25, ages > 65], [0.5, 0.8, 0.8], 1.0)
@@ -7,7 +7,11 @@ Used by StatisticsCollector to collect relavent information
 from __future__ import division
 from collections import Counter
 
+import numpy as np
+
 from .agent import Agent, Male, Female
+from .population_store import MISSING
+from .utils import age_years_from_ordinal, age_years_from_ordinals
 
 
 # Helper functions for statistics collection ---------------------------------
@@ -37,15 +41,38 @@ def prop_married_by_age(population, agent_type=Agent):
 
     """
     ages = range(100)
-    age_dist = get_age_distribution(population, agent_type=agent_type)
-    married_age_dist = get_age_distribution(population, agent_type=agent_type,
-                                            condition=lambda x: x.have_partner())
+    age_dist = counts_by_age(population, agent_type)
+    married_age_dist = counts_by_age(population, agent_type, partnered=True)
     get_prop = lambda x, y: x / y if y else 0  # avoid dividing by zero
     return [get_prop(married_age_dist[age], age_dist[age]) for age in ages]
 
 
-def get_age_distribution(population, agent_type=Female,
-                         condition=lambda x: True):
+def counts_by_age(population, agent_type=Agent, partnered=None, employed=None):
+    """
+    Read counts of agents by age in years from the population's status
+    histogram, rather than scanning the population.
+
+    Parameters
+    ----------
+    population:Population
+        instance of Population class. Expects attribute store.
+    agent_type: inherits from Agent
+        Class to restrict calculation to. e.g. Female.
+    partnered, employed: bool or None
+        If given, count only agents with (or without) a partner or job.
+
+    Returns
+    -------
+    numpy.ndarray
+        counts for each age in years; the last age includes all older agents.
+    """
+    female = {Male: False, Female: True}.get(agent_type)
+    return population.store.histogram.by_age(female=female,
+                                             partnered=partnered,
+                                             employed=employed)
+
+
+def get_age_distribution(population, agent_type=Female, condition=None):
     """
     Gets the age distribution of agents of some specified subclass of
     the base Agent type (eg Male, Female), but only those meeting the
@@ -67,6 +94,16 @@ def get_age_distribution(population, agent_type=Female,
 
     """
     age_dist = Counter()
+    if condition is None:
+        # read the age column rather than the status histogram, which counts
+        # those born later in the step at zero and clips the oldest
+        ages = population.store.column("age_years")
+        female = {Male: False, Female: True}.get(agent_type)
+        if female is not None:
+            ages = ages[population.store.column("female") == female]
+        values, counts = np.unique(ages, return_counts=True)
+        age_dist.update(dict(zip(values.tolist(), counts.tolist())))
+        return age_dist
     for agent in population.poplist:
         if condition(agent) and isinstance(agent, agent_type):
             age_dist[agent.age_years] += 1
@@ -77,13 +114,21 @@ def get_unemployment_rate(population, agent_type=Male):
     """
     divide total agents with job by total working age population
     """
-    emp_count = sum(agent.employment.have_job() for agent in population.poplist)
-    potential_workforce = sum(agent.employment.eligible_for_market() 
-                              for agent in population.poplist
-                              if isinstance(agent, agent_type))
+    emp_count = counts_by_age(population, employed=True).sum()
+    potential_workforce = eligible_by_age(population, agent_type).sum()
     return 1 - emp_count / float(potential_workforce)
 
 
+def eligible_by_age(population, agent_type):
+    """
+    Counts by age of agent_type eligible for the labour market
+    (see Employment.eligible_for_market; women do not work)
+    """
+    if agent_type is Female:
+        return np.zeros(len(counts_by_age(population)), dtype=np.int64)
+    return population.eligible_by_age()
+
+
 def get_unemp_skill_distribution(population):
     """
     get skill distribution of those unemployed male agents old enough to
@@ -98,8 +143,7 @@ def get_unemp_skill_distribution(population):
 
 def get_lab_force_size(population):
     # may depend on women work status
-    return sum(agent.employment.eligible_for_market() for agent in
-               population.poplist)
+    return population.get_lab_force_size()
 
 
 def get_youth_unemployment(population, agent_type=Male):
@@ -110,12 +154,10 @@ def get_cohort_unemployment(population, lower, upper, agent_type):
     """
     Get unemployment for those aged between lower and upper
     """
-    in_cohort = in_cohort_generator(lower, upper)
-    emp_count = sum(agent.employment.have_job() for agent in population.poplist
-                    if in_cohort(agent))
-    potential_workforce = sum(agent.employment.eligible_for_market() for agent in
-                              population.poplist if isinstance(agent, agent_type)
-                              and in_cohort(agent))
+    in_cohort = in_cohort_ages(population, lower, upper)
+    emp_count = counts_by_age(population, employed=True)[in_cohort].sum()
+    potential_workforce = eligible_by_age(population,
+                                          agent_type)[in_cohort].sum()
     return 1 - emp_count / float(potential_workforce)
 
 
@@ -123,20 +165,24 @@ def get_labour_cohort_count(population, lower, upper, agent_type):
     """
     Get count of people between ages lower and upper, of agent_type
     """
-    in_cohort = in_cohort_generator(lower, upper)
-    potential_workforce = sum(agent.employment.eligible_for_market() for agent in
-                              population.poplist if isinstance(agent, agent_type) and
-                              in_cohort(agent))
-    return potential_workforce
+    in_cohort = in_cohort_ages(population, lower, upper)
+    return eligible_by_age(population, agent_type)[in_cohort].sum()
 
 def get_cohort_count(population, lower, upper, agent_type):
     """
     Get count of people between ages lower and upper, of agent_type
     """
-    in_cohort = in_cohort_generator(lower, upper)
-    cohort_size = len([agent for agent in population.poplist
-                       if isinstance(agent, agent_type) and in_cohort(agent)])
-    return cohort_size
+    in_cohort = in_cohort_ages(population, lower, upper)
+    return counts_by_age(population, agent_type)[in_cohort].sum()
+
+
+def in_cohort_ages(population, lower, upper):
+    """
+    Boolean mask over the ages of the status histogram selecting those
+    between lower and upper (exclusive)
+    """
+    ages = np.arange(population.store.histogram.max_age + 1)
+    return (ages > lower) & (ages < upper)
 
 
 def in_cohort_generator(lower, upper):
@@ -162,26 +208,32 @@ def age_at_first_birth_distribution(population):
     Get list of ages at first birth of those (women, implicitly)
     with children
     """
-    return [age_at_first_birth(agent) for agent in population.poplist
-            if isinstance(agent, Female) and agent.children]
+    store = population.store
+    mothers = store.column("date_of_first_birth") != MISSING
+    first_child_ages = age_years_from_ordinals(
+        store.column("date_of_first_birth")[mothers],
+        population.agent_factory.timestepper.date)
+    return (store.column("age_years")[mothers] - first_child_ages).tolist()
 
 
 def skill_of_mothers_partners(population):
-    females = [agent for agent in population.poplist if isinstance(agent, Female)]
-    skill = [agent.partner.skill for agent in females
-             if agent.children]
-    return skill
+    """
+    Skill of the partners (living or dead) of mothers with a partner
+    """
+    store = population.store
+    partner_ids = store.column("partner_id")[
+        (store.column("parity") > 0) & (store.column("partner_id") != MISSING)]
+    return population.genealogy.gather("skill", partner_ids).tolist()
 
 
 def skill_of_mothers(population):
-    females = [agent for agent in population.poplist if isinstance(agent, Female)]
-    skill = [agent.skill for agent in females
-             if agent.children]
-    return skill
+    store = population.store
+    return store.column("skill")[store.column("parity") > 0].tolist()
 
 
 def age_at_first_birth(mother):
-    return mother.age_years - mother.children[0].age_years
+    return mother.age_years - age_years_from_ordinal(
+        mother.fertility.date_of_first_birth, mother.timestepper.date)
 
 
 stock_dispatch_dict = {"population": population_size,
@@ -0,0 +1,369 @@
+"""
+Columnar (struct-of-arrays) storage for the attributes of agents.
+
+Each agent is a thin view onto one row of a PopulationStore. Code that needs
+objects reads and writes attributes through the view exactly as before, while
+population level code can work on whole NumPy columns at once.
+"""
+from __future__ import division
+
+import numpy as np
+
+
+# sentinel for ids and dates that are not set (no partner, no job etc.)
+MISSING = -1
+
+
+class PopulationStore(object):
+    """
+    Hold agent attributes as NumPy arrays, one row per agent.
+
+    Rows are kept dense: removing an agent moves the last row into the gap,
+    so the first `size` rows of every column always describe the agents held.
+    The row holding each ident is indexed, so that kinship held as ident
+    columns (partner_id, mother_id etc.) can be followed with array gathers.
+    """
+    # dates are held as proleptic Gregorian ordinals, experience in days
+    columns = [("ident", np.int64),
+               ("DOB", np.int64),
+               ("age_years", np.int64),
+               ("skill", np.float64),
+               ("aspiration", np.float64),
+               ("experience", np.int64),
+               ("female", np.bool_),
+               ("wage", np.float64),
+               # kinship: idents of other agents, MISSING if none
+               ("partner_id", np.int64),
+               ("mother_id", np.int64),
+               ("household_id", np.int64),
+               # children form a list from the youngest, via elder siblings
+               ("youngest_child_id", np.int64),
+               ("elder_sibling_id", np.int64),
+               ("job_id", np.int64),
+               ("parity", np.int64),
+               ("date_of_first_birth", np.int64),
+               ("date_of_last_birth", np.int64),
+               ("imprinted", np.bool_),
+               ("in_marriage_market", np.bool_),
+               # position of the row in the status histogram, if counted
+               ("status_bin", np.int64)]
+
+    defaults = {"partner_id": MISSING,
+                "mother_id": MISSING,
+                "household_id": MISSING,
+                "youngest_child_id": MISSING,
+                "elder_sibling_id": MISSING,
+                "job_id": MISSING,
+                "date_of_first_birth": MISSING,
+                "date_of_last_birth": MISSING,
+                "status_bin": MISSING}
+
+    def __init__(self, capacity=1024, keep_agents=True, track_status=False):
+        """
+        Parameters
+        ----------
+        capacity: int
+            Number of rows to allocate initially. The store grows as needed.
+        keep_agents: bool
+            Whether to hold a reference to the view for each row. This is
+            required for removing rows, but not for append-only stores.
+        track_status: bool
+            Whether to maintain a StatusHistogram of the rows held. Rows are
+            counted once recount is called for them.
+        """
+        self.histogram = StatusHistogram() if track_status else None
+        self.column_names = frozenset(name for name, _ in self.columns)
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self.keep_agents = keep_agents
+        for name, dtype in self.columns:
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+        self.agents = np.empty(self.capacity if keep_agents else 0,
+                               dtype=object)
+        # row of each ident held, MISSING otherwise
+        self.row_of = np.full(self.capacity, MISSING, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name):
+        """
+        Return a view of the occupied part of a column
+        """
+        return getattr(self, name)[:self.size]
+
+    def snapshot(self):
+        """
+        Return a copy of the occupied part of every column, keyed by name.
+        As kinship is held as idents this describes the population fully.
+        """
+        return {name: self.column(name).copy() for name, _ in self.columns}
+
+    def live_agents(self):
+        """
+        Return the agent views for the occupied rows, in row order
+        """
+        return self.agents[:self.size]
+
+    def append(self, agent):
+        """
+        Add a row with default values for agent, returning its row index
+        """
+        if self.size == self.capacity:
+            self._grow()
+        row = self.size
+        for name, _ in self.columns:
+            getattr(self, name)[row] = self.defaults.get(name, 0)
+        if self.keep_agents:
+            self.agents[row] = agent
+        self.size += 1
+        return row
+
+    def remove(self, row):
+        """
+        Remove a row by moving the last row into its place
+        """
+        if not self.keep_agents:
+            raise ValueError("Cannot remove rows from an append-only store")
+        if self.histogram is not None and self.status_bin[row] != MISSING:
+            self.histogram.counts.flat[self.status_bin[row]] -= 1
+        last = self.size - 1
+        self._reindex(row, MISSING)
+        if row != last:
+            for name, _ in self.columns:
+                column = getattr(self, name)
+                column[row] = column[last]
+            moved = self.agents[last]
+            self.agents[row] = moved
+            moved._row = row
+            self._reindex(last, row)
+        self.agents[last] = None
+        self.size = last
+
+    def transfer(self, row, other):
+        """
+        Move a row to another store, repointing its view to the new row.
+        Only the columns held by the other store are copied.
+        """
+        agent = self.agents[row]
+        new_row = other.append(agent)
+        for name, _ in other.columns:
+            getattr(other, name)[new_row] = getattr(self, name)[row]
+        other.index_ident(new_row)
+        self.remove(row)
+        agent._store = other
+        agent._row = new_row
+        return new_row
+
+    def has_column(self, name):
+        """
+        Whether this store holds column name
+        """
+        return name in self.column_names
+
+    def index_ident(self, row):
+        """
+        Record that row holds the agent whose ident is in the ident column
+        """
+        ident = self.ident.item(row)
+        if ident >= len(self.row_of):
+            row_of = np.full(max(2 * len(self.row_of), ident + 1), MISSING,
+                             dtype=np.int64)
+            row_of[:len(self.row_of)] = self.row_of
+            self.row_of = row_of
+        self.row_of[ident] = row
+
+    def _reindex(self, old_row, new_row):
+        """
+        Point the index entry for the ident at old_row to new_row, if the
+        ident was indexed. The ident is read from new_row when it is a row
+        (the values have already been moved there), otherwise from old_row.
+        """
+        ident = self.ident.item(old_row if new_row == MISSING else new_row)
+        if ident < len(self.row_of) and self.row_of[ident] == old_row:
+            self.row_of[ident] = new_row
+
+    def row_of_ident(self, ident):
+        """
+        Row holding a single ident, MISSING if not held here
+        """
+        if 0 <= ident < len(self.row_of):
+            return self.row_of.item(ident)
+        return MISSING
+
+    def rows_of(self, idents):
+        """
+        Rows holding an array of idents, MISSING for those not held here
+        """
+        idents = np.asarray(idents)
+        known = (idents >= 0) & (idents < len(self.row_of))
+        rows = np.full(idents.shape, MISSING, dtype=np.int64)
+        rows[known] = self.row_of[idents[known]]
+        return rows
+
+    def recount(self, rows):
+        """
+        Move rows (an index array) to the histogram bins matching their
+        current age, partner and job columns
+        """
+        if self.histogram is None:
+            return
+        new_bins = self.histogram.bins(self.age_years[rows], self.female[rows],
+                                       self.partner_id[rows] != MISSING,
+                                       self.job_id[rows] != MISSING)
+        old_bins = self.status_bin[rows]
+        self.histogram.move(old_bins[old_bins != MISSING], new_bins)
+        self.status_bin[rows] = new_bins
+
+    def recount_row(self, row):
+        """
+        As recount, for a single row
+        """
+        if self.histogram is None:
+            return
+        new_bin = self.histogram.bin(self.age_years.item(row),
+                                     self.female.item(row),
+                                     self.partner_id.item(row) != MISSING,
+                                     self.job_id.item(row) != MISSING)
+        old_bin = self.status_bin.item(row)
+        if new_bin != old_bin:
+            counts = self.histogram.counts.reshape(-1)
+            if old_bin != MISSING:
+                counts[old_bin] -= 1
+            counts[new_bin] += 1
+            self.status_bin[row] = new_bin
+
+    def _grow(self):
+        """
+        Double the capacity of every column
+        """
+        self.capacity *= 2
+        for name, _ in self.columns:
+            column = getattr(self, name)
+            new_column = np.zeros(self.capacity, dtype=column.dtype)
+            new_column[:self.size] = column[:self.size]
+            setattr(self, name, new_column)
+        if self.keep_agents:
+            agents = np.empty(self.capacity, dtype=object)
+            agents[:self.size] = self.agents[:self.size]
+            self.agents = agents
+
+
+class ArchiveStore(PopulationStore):
+    """
+    Append-only store for the dead, holding only the columns still read
+    once an agent has died, in narrower types: identity, the skill and
+    aspiration a widowed partner's fertility depends on, kinship, and
+    fertility history. age_years is the age at death. No agent views are
+    kept, so the objects of the dead can be garbage collected once the
+    living no longer refer to them.
+    """
+    columns = [("ident", np.int64),
+               ("DOB", np.int32),
+               ("age_years", np.int16),
+               ("skill", np.float64),
+               ("aspiration", np.float64),
+               ("female", np.bool_),
+               ("partner_id", np.int32),
+               ("mother_id", np.int32),
+               ("household_id", np.int32),
+               ("youngest_child_id", np.int32),
+               ("elder_sibling_id", np.int32),
+               ("parity", np.int16),
+               ("date_of_first_birth", np.int32),
+               ("date_of_last_birth", np.int32)]
+
+    def __init__(self, capacity=1024):
+        PopulationStore.__init__(self, capacity, keep_agents=False)
+
+
+class StatusHistogram(object):
+    """
+    Counts of agents by age in years, sex, partnered and employed, kept up to
+    date by the store as rows are added, removed and change status.
+    Ages above max_age are counted at max_age, and those below zero (born
+    later in the current timestep) at zero.
+
+    counts[age, female, partnered, employed]
+    """
+    max_age = 120
+
+    def __init__(self):
+        self.counts = np.zeros((self.max_age + 1, 2, 2, 2), dtype=np.int64)
+
+    def bin(self, age, female, partnered, employed):
+        """
+        Flat index of the bin for one agent
+        """
+        return ((min(max(age, 0), self.max_age) * 2 + female) * 2 + partnered) * 2 \
+            + employed
+
+    def bins(self, ages, female, partnered, employed):
+        """
+        Flat indices of the bins for arrays of agent attributes
+        """
+        ages = np.clip(ages, 0, self.max_age)
+        return ((ages * 2 + female) * 2 + partnered) * 2 + employed
+
+    def move(self, old_bins, new_bins):
+        """
+        Take one from each of old_bins and add one to each of new_bins
+        """
+        size = self.counts.size
+        change = (np.bincount(new_bins, minlength=size) -
+                  np.bincount(old_bins, minlength=size))
+        self.counts += change.reshape(self.counts.shape)
+
+    def by_age(self, female=None, partnered=None, employed=None):
+        """
+        Counts by age in years, of the agents matching those of female,
+        partnered and employed that are given (True or False).
+        """
+        index = tuple(slice(None) if value is None else int(value)
+                      for value in (female, partnered, employed))
+        counts = self.counts[(slice(None),) + index]
+        return counts.reshape(self.max_age + 1, -1).sum(axis=1)
+
+
+class StoreView(object):
+    """
+    Base class for objects whose attributes live in a PopulationStore row
+    """
+    __slots__ = ["_store", "_row"]
+
+    def attach(self, store):
+        """
+        Claim a new row in store for this view
+        """
+        self._store = store
+        self._row = store.append(self)
+
+    def update_status_counts(self):
+        """
+        Bring the store's status histogram up to date for this row
+        """
+        self._store.recount_row(self._row)
+
+
+def column_property(name, via=None, doc=None):
+    """
+    Construct a property reading and writing column `name` of the row of a
+    StoreView. If via is given, the view is found in that attribute of the
+    instance, so that helper objects (e.g. fertility) can share their
+    agent's row.
+    """
+    if via is None:
+        def fget(obj):
+            return getattr(obj._store, name).item(obj._row)
+
+        def fset(obj, value):
+            getattr(obj._store, name)[obj._row] = value
+    else:
+        def fget(obj):
+            view = getattr(obj, via)
+            return getattr(view._store, name).item(view._row)
+
+        def fset(obj, value):
+            view = getattr(obj, via)
+            getattr(view._store, name)[view._row] = value
+    return property(fget, fset, doc=doc)
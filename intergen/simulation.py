@@ -71,10 +71,7 @@ class Simulation(BaseSim):
         """
 
         for _ in range(self.params["job_burnin_rounds"]):
-            indexes = list(range(len(self.pop.poplist)))
-            nprnd.shuffle(indexes)
-            for i in indexes:
-                self.pop.poplist[i].employment.job_setup_activity(self.labour_market)
+            self.pop.do_applications(self)
             self.labour_market.send_offers(self.pop)
             self.pop.resolve_job_offers()
 
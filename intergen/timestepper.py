@@ -27,6 +27,9 @@ class TimeStepper(object):
             logging.warning("Starting the simulation near the end of a month"
                             "results in monthly timesteps running out of sync")
         self.date = copy.deepcopy(self.start_date)
+        # dates as integer day ordinals, for use in array code
+        self.start_ordinal = self.start_date.toordinal()
+        self.ordinal = self.start_ordinal
         self._determine_step_length_function()
         self.timestep_length = self.step_length_function()
 
@@ -42,6 +45,7 @@ class TimeStepper(object):
         Increase current date by one timestep_length
         """
         self.date += self.timestep_length
+        self.ordinal += self.timestep_length.days
 
     def update_timestep_length(self):
         """
@@ -55,6 +59,12 @@ class TimeStepper(object):
         """
         return self.date
 
+    def get_ordinal(self):
+        """
+        Return the current date as a proleptic Gregorian ordinal
+        """
+        return self.ordinal
+
     def get_timestep_length(self):
         """
         Return the current timestep_length as a datetime object
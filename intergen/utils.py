@@ -1,4 +1,5 @@
 import os
+import datetime
 import yaml
 from math import exp
 
@@ -12,6 +13,9 @@ DEFAULT_PARAMS_FILE = os.path.join(CONFIG_DIR, "defaultParams.yaml")
 DEFAULT_PARAM_RANGE_FILE = os.path.join(CONFIG_DIR, "param_ranges.yaml")
 RESULTS_PATH = os.path.abspath(os.path.join(DIR, "..", "results"))
 
+# ordinal of the numpy datetime64 epoch
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
 
 def load_yaml(yaml_file):
     """
@@ -69,6 +73,46 @@ def calculate_age_years(DOB, today):
             ((today.month, today.day) < (DOB.month, DOB.day)))
 
 
+def age_years_from_ordinal(DOB, today):
+    """
+    calculate_age_years for a date of birth given as a day ordinal
+    """
+    return calculate_age_years(datetime.date.fromordinal(DOB), today)
+
+
+def year_from_ordinal(ordinal):
+    """
+    Calendar year of a day ordinal
+    """
+    return datetime.date.fromordinal(ordinal).year
+
+
+def years_from_ordinals(ordinals):
+    """
+    Calendar years of an array of day ordinals
+    """
+    dates = (np.asarray(ordinals) - EPOCH_ORDINAL).astype("datetime64[D]")
+    return dates.astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+def age_years_from_ordinals(DOBs, today):
+    """
+    Vectorised calculate_age_years for an array of dates of birth given as
+    day ordinals.
+    """
+    dates = (np.asarray(DOBs) - EPOCH_ORDINAL).astype("datetime64[D]")
+    years = dates.astype("datetime64[Y]")
+    months = dates.astype("datetime64[M]")
+    # month (0-11) and day (0-30) of each birthday
+    birth_month = (months - years).astype(np.int64)
+    birth_day = (dates - months).astype(np.int64)
+    month, day = today.month - 1, today.day - 1
+    birthday_to_come = ((month < birth_month) |
+                        ((month == birth_month) & (day < birth_day)))
+    return (today.year - (years.astype(np.int64) + 1970) -
+            birthday_to_come.astype(np.int64))
+
+
 def gompertz_mortality_fact(a, b, l, start):
     """
     construct gompertz mortality function
@@ -84,7 +128,33 @@ def gompertz_mortality_fact(a, b, l, start):
     return gompertz
 
 
+def gompertz_hazard(ages, a, b, l, start):
+    """
+    Vectorised gompertz mortality: annual probability of dying for each
+    element of an array of ages. Ages at or below start have zero hazard,
+    matching Agent.check_survival.
+    """
+    ages = np.asarray(ages)
+    hazard = l + a * np.exp(b * (ages - start))
+    return np.where(ages > start, hazard, 0.0)
+
+
+def partnering_hazard(ages, a, alpha, mu, lambda_p):
+    """
+    Vectorised annual hazard of entering the marriage market at each age
+    (see Agent.find_partner)
+    """
+    ages = np.asarray(ages)
+    return a * np.exp(-alpha * (ages - mu) - np.exp(- lambda_p * (ages - mu)))
+
+
 def get_productivity_function(params):
+    """
+    Return the productivity function chosen by the prod_type parameter.
+    Each works on single values or elementwise on arrays of experience,
+    skill and job difficulty, so that the wages of all occupied jobs can be
+    computed at once.
+    """
     alpha = params["wage_alpha"]
     beta = params["wage_beta"]
     gamma = params["wage_gamma"]
@@ -92,24 +162,24 @@ def get_productivity_function(params):
     nu = params["wage_nu"]
     if params["prod_type"] == "experience":
         def prod_func(market, experience, *args, **kwargs):
-            experience_years = experience.days // params["year_length"]
+            experience_years = experience // params["year_length"]
             prod = np.exp(gamma * experience_years -
                           delta * experience_years ** 2)
             return prod
         return prod_func
     elif params["prod_type"] == "exper-skill":
         def prod_func(market, experience, skill, *args, **kwargs):
-            experience_years = experience.days // params["year_length"]
+            experience_years = experience // params["year_length"]
             prod = skill * np.exp(gamma * experience_years -
                           delta * experience_years ** 2)
             return prod
         return prod_func
     elif params["prod_type"] == "difficulty":
         def prod_func(market, experience, skill, difficulty):
-            experience_years = experience.days // params["year_length"]
+            experience_years = experience // params["year_length"]
             prod = (difficulty ** beta *   # technology contribution
                     # productivity contribution
-                    exp((alpha * skill - difficulty) +
+                    np.exp((alpha * skill - difficulty) +
                         # experience contribution
                         skill + gamma * experience_years -
                         delta * experience_years**2))
@@ -121,7 +191,7 @@ def get_productivity_function(params):
             Logistic productivity function - implies productivity asymptotes as
             difference between skill and diffculty increases.
             """
-            experience_years = experience.days // params["year_length"]
+            experience_years = experience // params["year_length"]
             prod = (  # experience contribution
                     np.exp(gamma * experience_years -
                            delta * experience_years ** 2) *
@@ -129,7 +199,7 @@ def get_productivity_function(params):
                     (difficulty ** beta /
                      # productivity contribution
                      (1 + np.exp(- alpha * (skill - difficulty))) ** nu))
-            return max(prod, 0.02)
+            return np.maximum(prod, 0.02)
         return prod_func
     else:
         raise NotImplemented("Don't recognise parameter prod_type== {}\n"
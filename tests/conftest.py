@@ -0,0 +1,63 @@
+"""
+Fixtures shared by the tests, building populations and simulations from the
+default parameters.
+"""
+import pytest
+import yaml
+
+import sys
+sys.path.append('..')
+
+from intergen.agent_factory import AgentFactory
+from intergen.population import Population
+from intergen.simulation import Simulation
+from intergen.statistics_collector import (StatisticsCollector,
+                                           VoidStatisticsCollector)
+from intergen.timestepper import TimeStepper
+from intergen.utils import DEFAULT_PARAMS_FILE, DEFAULT_STATS_FILE
+
+
+def load_params(**overrides):
+    """
+    The default parameters, with any overrides
+    """
+    with open(DEFAULT_PARAMS_FILE) as f:
+        params = yaml.safe_load(f)
+    params.update(overrides)
+    return params
+
+
+@pytest.fixture
+def default_params():
+    return load_params()
+
+
+@pytest.fixture
+def small_population():
+    """
+    Return a function making a Population of pop_size initial agents,
+    outside of any simulation, along with its TimeStepper. Keyword arguments
+    override the default parameters.
+    """
+    def make(pop_size, **overrides):
+        params = load_params(pop_size=pop_size, **overrides)
+        timestepper = TimeStepper(params)
+        factory = AgentFactory(params, timestepper, VoidStatisticsCollector())
+        return Population(params, None, factory), timestepper
+    return make
+
+
+@pytest.fixture
+def small_sim():
+    """
+    Return a function making a Simulation of pop_size agents, run for steps
+    timesteps. Keyword arguments override the default parameters.
+    """
+    def make(pop_size=1000, steps=0, seed=1, **overrides):
+        params = load_params(pop_size=pop_size, **overrides)
+        with open(DEFAULT_STATS_FILE) as f:
+            stats = StatisticsCollector(yaml.safe_load(f))
+        sim = Simulation(params, stats, seed=seed)
+        sim.run_sim(steps)
+        return sim
+    return make
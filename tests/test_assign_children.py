@@ -0,0 +1,44 @@
+import random as rnd
+
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.agent import Female
+from intergen.population import MAX_SETUP_PARITY
+
+
+def test_children_assigned_within_age_and_parity_limits(small_population):
+    rnd.seed(1)
+    np.random.seed(1)
+    # every partnered woman may be a mother under simple fertility
+    pop, _ = small_population(5000, fertility_type="simple")
+    pop.do_partnership_setup()
+    children = [agent for agent in pop.poplist if agent.age_years <= 16]
+    mothers = [agent for agent in pop.poplist
+               if isinstance(agent, Female) and agent.children_ids()]
+    assert mothers
+    assert sum(child.mother is not None for child in children) > 0.9 * len(children)
+    for mother in mothers:
+        own = [pop.genealogy.live_agent(ident)
+               for ident in mother.children_ids()]
+        assert mother.fertility.parity == len(own)
+        assert mother.fertility.parity <= MAX_SETUP_PARITY + 1
+        assert mother.fertility.date_of_first_birth == min(
+            child.DOB for child in own)
+        assert mother.fertility.date_of_last_birth == max(
+            child.DOB for child in own)
+        for child in own:
+            assert child.mother is mother
+            assert child.household_id == mother.household_id
+            assert 17 <= mother.age_years - child.age_years <= 45
+
+
+def test_matching_children_weights(small_population):
+    pop, _ = small_population(10, fertility_type="simple")
+    assert pop.matching_children(16, 0) == 0
+    assert pop.matching_children(25, 0) == 1
+    assert pop.matching_children(40, 0) == 0.2
+    assert pop.matching_children(25, 2) == 0.5
+    assert pop.matching_children(25, MAX_SETUP_PARITY + 1) == 0
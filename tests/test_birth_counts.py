@@ -0,0 +1,73 @@
+from collections import Counter
+
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.birth_counts import BirthCounts
+
+
+def test_counts_match_counter():
+    years = np.random.randint(1900, 2000, size=1000)
+    reference = Counter(years.tolist())
+    counts = BirthCounts(2000, span=120)
+    counts.add_many(years[:500])
+    for year in years[500:]:
+        counts.add(year)
+    query = np.arange(1850, 2010)
+    assert np.allclose(counts.get(query), [reference[y] for y in query])
+    assert counts[1950] == reference[1950]
+
+
+def test_window_moves_on():
+    counts = BirthCounts(2000, span=10)
+    counts.add_many(np.array([1985, 1991, 1995, 2000]),
+                    weights=np.array([5.0, 1.0, 2.0, 3.0]))
+    # 1985 falls outside the window and is dropped
+    assert counts[1985] == 0
+    assert counts[1991] == 1
+    version = counts.version
+    counts.add(2003)
+    assert counts.version > version
+    assert counts.latest_year == 2003
+    assert counts[1991] == 0
+    assert counts[1995] == 2
+    assert counts[2003] == 1
+    # the slots reused for 2001 and 2002 have been cleared
+    assert counts[2001] == 0 and counts[2002] == 0
+    counts.add(2050)
+    assert not counts.get(np.arange(2040, 2051))[:-1].any()
+
+
+def test_version_of_follows_years_written():
+    counts = BirthCounts(2000, span=10)
+    counts.add_many(np.array([1995, 1996]))
+    read = np.array([1994, 1995])
+    version = counts.version_of(read)
+    counts.add(2000)
+    counts.add(1996)
+    assert counts.version_of(read) == version
+    counts.add(1994)
+    assert counts.version_of(read) > version
+
+
+def test_current_year_births_keep_cohort_sizes_cached(small_sim):
+    sim = small_sim(500)
+    pop = sim.pop
+    computed = []
+    calc = pop.calc_relative_cohort_sizes
+
+    def counting_calc(year, sex):
+        computed.append(year)
+        return calc(year, sex)
+    pop.calc_relative_cohort_sizes = counting_calc
+
+    sizes = pop.get_relative_cohort_sizes("Female")
+    pop.female_birth_ts.add(pop.cohort_year)
+    assert pop.get_relative_cohort_sizes("Female") is sizes
+    assert len(computed) == 1
+    # a birth in a cohort of working age does change the sizes
+    pop.female_birth_ts.add(pop.cohort_year - 30)
+    assert pop.get_relative_cohort_sizes("Female") is not sizes
+    assert len(computed) == 2
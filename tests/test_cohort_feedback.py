@@ -0,0 +1,26 @@
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.labmarket import cohort_feedback_kernel
+
+
+def feedback_single(year, relative_sizes, working_birth_years, cohort_width):
+    var = (cohort_width / 2) ** 2
+    weights = np.exp(- (1 / var) * (working_birth_years - year) ** 2)
+    return (1 / np.sum(weights)) * relative_sizes.dot(weights)
+
+
+def test_kernel_matches_per_cohort_weights():
+    ages = np.arange(15, 70)
+    birth_years = 1950 - ages
+    relative_sizes = 1 - np.random.RandomState(1).lognormal(0, 0.3, len(ages))
+    for cohort_width in [1.0, 5.0, 12.5]:
+        kernel = cohort_feedback_kernel(ages, cohort_width)
+        expected = [feedback_single(year, relative_sizes, birth_years,
+                                    cohort_width)
+                    for year in birth_years]
+        assert kernel.shape == (55, 55)
+        assert np.allclose(kernel.sum(axis=1), 1)
+        assert np.allclose(kernel.dot(relative_sizes), expected)
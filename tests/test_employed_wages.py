@@ -0,0 +1,34 @@
+import pytest
+
+import sys
+sys.path.append('..')
+
+from intergen.labmarket import EmployedWages
+
+
+def test_min_follows_changes():
+    wages = EmployedWages()
+    with pytest.raises(ValueError):
+        wages.min()
+    wages.set(1, 3.0)
+    wages.set(2, 1.0)
+    wages.set(3, 2.0)
+    assert wages.min() == 1.0
+    wages.set(2, 5.0)
+    assert wages.min() == 2.0
+    wages.discard(3)
+    assert wages.min() == 3.0
+    assert len(wages) == 2
+    # repeated updates do not let the heap grow without bound
+    for i in range(1000):
+        wages.set(1, float(i))
+    assert len(wages.heap) < 100
+    assert wages.min() == 5.0
+
+
+def test_min_matches_employed_agents(small_sim):
+    sim = small_sim(1000, 3)
+    wages = [agent.employment.wage for agent in sim.pop.poplist
+             if agent.employment.have_job()]
+    assert sim.labour_market.employed_wages.min() == min(wages)
+    assert len(sim.labour_market.employed_wages) == len(wages)
@@ -0,0 +1,88 @@
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.genealogy import Genealogy
+from intergen.population_store import (PopulationStore, ArchiveStore,
+                                       StoreView, column_property, MISSING)
+
+
+class View(StoreView):
+    __slots__ = ()
+    ident = column_property("ident")
+    skill = column_property("skill")
+    partner_id = column_property("partner_id")
+    mother_id = column_property("mother_id")
+    household_id = column_property("household_id")
+    youngest_child_id = column_property("youngest_child_id")
+    elder_sibling_id = column_property("elder_sibling_id")
+
+    def __init__(self, store, ident):
+        self.attach(store)
+        self.ident = ident
+        self.skill = ident / 10.0
+        self.household_id = ident
+        store.index_ident(self._row)
+
+    @property
+    def partner(self):
+        return self.partner_id
+
+    @partner.setter
+    def partner(self, other):
+        self.partner_id = other.ident
+
+
+def get_family():
+    live = PopulationStore()
+    dead = ArchiveStore()
+    genealogy = Genealogy(live, dead)
+    views = [View(live, i) for i in range(6)]
+    mother, father = views[0], views[1]
+    genealogy.partner(mother, father)
+    for child in views[2:5]:
+        genealogy.add_child(mother, child)
+    return live, dead, genealogy, views
+
+
+def test_children_eldest_first_in_mothers_household():
+    live, dead, genealogy, views = get_family()
+    assert genealogy.children_ids(0) == [2, 3, 4]
+    assert genealogy.children_ids(5) == []
+    assert views[1].household_id == 0
+    assert all(child.household_id == 0 for child in views[2:5])
+    assert all(child.mother_id == 0 for child in views[2:5])
+
+
+def test_gather_follows_idents_to_the_dead():
+    live, dead, genealogy, views = get_family()
+    live.transfer(views[1]._row, dead)
+    live.remove(views[3]._row)
+    assert genealogy.live_agent(1) is None
+    assert genealogy.live_agent(4) is views[4]
+    assert list(live.rows_of([0, 1, 3, 4])) == [views[0]._row, MISSING,
+                                                MISSING, views[4]._row]
+    skills = genealogy.gather("skill", [1, 4, MISSING], missing=-1.0)
+    assert np.allclose(skills, [0.1, 0.4, -1.0])
+    # the dead father's row still records his partner
+    assert genealogy.value("partner_id", 1) == 0
+
+
+def test_snapshot_copies_columns():
+    live, dead, genealogy, views = get_family()
+    snapshot = live.snapshot()
+    views[2].skill = 5.0
+    assert list(snapshot["mother_id"]) == [MISSING, MISSING, 0, 0, 0, MISSING]
+    assert snapshot["skill"][2] == 0.2
+
+
+def test_archive_keeps_only_archived_columns():
+    live, dead, genealogy, views = get_family()
+    live.wage[views[1]._row] = 2.0
+    live.transfer(views[1]._row, dead)
+    assert dead.has_column("skill")
+    assert not dead.has_column("wage")
+    assert len(dead.agents) == 0
+    assert genealogy.value("skill", 1, missing=-1.0) == 0.1
+    assert genealogy.value("wage", 1, missing=-1.0) == -1.0
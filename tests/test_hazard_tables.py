@@ -0,0 +1,63 @@
+import datetime
+from math import exp
+
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.fertility import (get_fecundity_func, hadwiger_fertility,
+                                subsequent_fertility)
+from intergen.hazard_tables import HazardTables, MAX_HAZARD_AGE
+from intergen.timestepper import TimeStepper
+
+
+def get_tables(params):
+    timestepper = TimeStepper(params)
+    return HazardTables(params, timestepper), params, timestepper
+
+
+def test_tables_match_rate_functions(default_params):
+    tables, params, timestepper = get_tables(default_params)
+    mult = timestepper.get_timestep_days() / params["year_length"]
+    ages = range(1, MAX_HAZARD_AGE + 1)
+    hadwiger = [hadwiger_fertility(age, params["base_fertility_a"],
+                                   params["base_fertility_b"],
+                                   params["base_fertility_c"]) * mult
+                for age in ages]
+    assert np.allclose(tables.base_fertility_step[1:], hadwiger)
+    fecundity = get_fecundity_func(params["fecundity_a"],
+                                   params["fecundity_b"],
+                                   params["fecundity_c"],
+                                   params["fecundity_mu"])
+    assert np.allclose(tables.fecundity, [fecundity(age)
+                                          for age in tables.ages])
+    sub_fert = subsequent_fertility(params["further_fertility_a"],
+                                    params["further_fertility_b"],
+                                    params["further_fertility_mu"])
+    assert np.allclose(tables.subsequent_step,
+                       [sub_fert(age) * mult for age in tables.ages])
+    age = 25
+    mu = params["partnering_mu"]
+    partnering = mult * params["partnering_a"] * exp(
+        -params["partnering_alpha"] * (age - mu) -
+        exp(-params["partnering_lambda"] * (age - mu)))
+    assert np.isclose(tables.at(tables.partnering_step, age), partnering)
+    # ages beyond the table are looked up at the last age
+    assert tables.at(tables.mortality_step, 130) == tables.mortality_step[-1]
+    assert np.all(tables.index(np.array([-1, 50, 200])) ==
+                  [0, 50, MAX_HAZARD_AGE])
+
+
+def test_refresh_on_step_length_change(default_params):
+    tables, params, timestepper = get_tables(default_params)
+    yearly = tables.mortality_step
+    timestepper.timestep_length = datetime.timedelta(days=30)
+    tables.refresh()
+    assert tables.mult == 30 / params["year_length"]
+    assert np.allclose(tables.mortality_step, tables.mortality * tables.mult)
+    assert tables.mortality_step is not yearly
+    # unchanged step length leaves the tables alone
+    monthly = tables.partnering_step
+    tables.refresh()
+    assert tables.partnering_step is monthly
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+import sys
+sys.path.append('..')
+
+from intergen.job_matching import (IdentSet, OfferLedger, draw_targets,
+                                   floor_windows, segment_argmax)
+
+
+def test_segment_argmax_takes_first_maximum():
+    values = np.array([1.0, 3.0, 3.0, -2.0, 5.0, 0.0, 0.0])
+    indptr = np.array([0, 3, 4, 7])
+    assert list(segment_argmax(values, indptr)) == [1, 3, 4]
+
+
+def test_ledger_best_offer_per_agent():
+    ledger = OfferLedger()
+    ledger.record(np.array([7, 3, 7]), np.array([1, 2, 3]),
+                  np.array([0.5, 0.2, 0.9]))
+    ledger.record(np.array([3, 9]), np.array([4, 5]), np.array([0.2, 0.1]))
+    best = ledger.best_offers()
+    assert sorted(zip(ledger.agent_ids[best].tolist(),
+                      ledger.job_ids[best].tolist())) == [(3, 2), (7, 3), (9, 5)]
+    ledger.clear()
+    assert len(ledger) == 0
+
+
+def test_ident_set_swaps_last_into_gap():
+    idents = IdentSet(capacity=2)
+    for ident in [4, 8, 15, 16, 8]:
+        idents.add(ident)
+    assert list(idents.idents()) == [4, 8, 15, 16]
+    assert idents.discard(4)
+    assert not idents.discard(23)
+    assert list(idents.idents()) == [16, 8, 15]
+    assert 16 in idents and 4 not in idents
+
+
+@pytest.mark.parametrize("n_vacancies", [0, 3, 20, 1000])
+def test_draw_targets_distinct_per_applicant(n_vacancies):
+    np.random.seed(1)
+    counts = np.random.poisson(15, size=200)
+    applicants, targets = draw_targets(counts, n_vacancies)
+    assert np.all((targets >= 0) & (targets < max(n_vacancies, 1)))
+    assert np.array_equal(np.bincount(applicants, minlength=len(counts)),
+                          np.minimum(counts, n_vacancies))
+    pairs = set(zip(applicants.tolist(), targets.tolist()))
+    assert len(pairs) == len(applicants)
+
+
+def test_draw_targets_per_applicant_limits():
+    np.random.seed(2)
+    limits = np.array([0, 1, 5, 50, 500])
+    applicants, targets = draw_targets(np.full(5, 10), limits)
+    assert list(np.bincount(applicants, minlength=5)) == [0, 1, 5, 10, 10]
+    assert np.all(targets < limits[applicants])
+
+
+def test_floor_windows_match_eligibility():
+    exp_max = 10
+    floors = np.arange(0, 365 * 12, 7.5)
+    for experience in range(0, 365 * 14, 97):
+        eligible = [floor <= experience and
+                    (experience - floor < 365 * 4 or
+                     floor > 365 * (exp_max - 4))
+                    for floor in floors]
+        lower, upper = floor_windows(np.array([experience]), exp_max)
+        in_window = (floors > lower[0]) & (floors <= upper[0])
+        assert list(in_window) == eligible
+
+
+def test_applications_respect_experience_floors(small_sim):
+    sim = small_sim(1000, 2, experience_floor=True)
+    market, pop = sim.labour_market, sim.pop
+    floors = [floor for floor, _ in market.vacancies.floors]
+    assert floors == sorted(floors)
+    assert len(floors) == len(market.vacancies)
+    pop.do_applications(sim)
+    apps = market.applications
+    assert len(apps)
+    for i, job in enumerate(apps.jobs):
+        for row in apps.rows[apps.indptr[i]:apps.indptr[i + 1]]:
+            employment = pop.store.agents[row].employment
+            assert employment._check_eligible(job)
+
+
+@pytest.mark.parametrize("criteria", ["wage", "prod", "profit"])
+def test_winners_match_per_job_choice(criteria, small_sim):
+    sim = small_sim(1000, 2, app_criteria=criteria)
+    market, pop = sim.labour_market, sim.pop
+    pop.do_applications(sim)
+    apps = market.applications
+    assert len(apps)
+    job_ids, rows, wages = market.choose_winners(pop)
+    chosen = dict((job_id, (row, wage))
+                  for job_id, row, wage in zip(job_ids, rows, wages))
+    for i, job in enumerate(apps.jobs):
+        applicants = [pop.store.agents[row].employment
+                      for row in apps.rows[apps.indptr[i]:apps.indptr[i + 1]]]
+        result = job._pick_winner(pop, applicants)
+        if result is False:
+            assert job.ident not in chosen
+        else:
+            ind, wage = result
+            row, chosen_wage = chosen[job.ident]
+            assert applicants[ind].agent._row == row
+            assert chosen_wage == pytest.approx(wage)
+
+
+def test_resolved_offers_fill_jobs(small_sim):
+    sim = small_sim(1000, 2)
+    market, pop = sim.labour_market, sim.pop
+    pop.do_applications(sim)
+    market.send_offers(pop)
+    best = {}
+    for agent_id, job_id, wage in zip(market.offers.agent_ids.tolist(),
+                                      market.offers.job_ids.tolist(),
+                                      market.offers.wages.tolist()):
+        if agent_id not in best or wage > best[agent_id][1]:
+            best[agent_id] = (job_id, wage)
+    assert best
+    pop.resolve_job_offers()
+    assert len(market.offers) == 0
+    jobs = dict((job.ident, job) for job in market.joblist)
+    for agent_id, (job_id, wage) in best.items():
+        job = jobs[job_id]
+        assert job.occupant.agent.ident == agent_id
+        assert job.occupant.job is job
+        assert job.occupant.wage == wage
+        assert job not in market.vacancies
+
+
+def test_registry_matches_population_scan(small_sim):
+    sim = small_sim(1000, 5)
+    pop = sim.pop
+    expected = [agent._row for agent in pop.store.live_agents()
+                if agent.employment.participate_in_market()]
+    assert expected
+    assert sorted(pop.jobseeker_rows().tolist()) == sorted(expected)
+    registry = pop.jobseekers
+    for agent in pop.store.live_agents():
+        registered = agent.ident in registry
+        assert registered == agent.employment.eligible_for_market()
+        if registered:
+            assert ((agent.ident in registry.employed) ==
+                    agent.employment.have_job())
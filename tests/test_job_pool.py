@@ -0,0 +1,37 @@
+import random as rnd
+
+import pytest
+
+import sys
+sys.path.append('..')
+
+from intergen.labmarket import JobPool
+
+
+class Item(object):
+    def __init__(self, ident):
+        self.ident = ident
+
+
+def test_swap_remove_keeps_positions():
+    items = [Item(i) for i in range(10)]
+    pool = JobPool(items)
+    rnd.seed(1)
+    removed = rnd.sample(items, 6)
+    for item in removed:
+        pool.remove(item)
+        assert item not in pool
+        for pos, held in enumerate(pool):
+            assert pool.position[held.ident] == pos
+    assert len(pool) == 4
+    with pytest.raises(KeyError):
+        pool.remove(removed[0])
+    assert len(pool.sample(10)) == 4
+
+
+def test_pools_match_job_states(small_sim):
+    sim = small_sim(1000, 3)
+    market = sim.labour_market
+    vacant = set(job.ident for job in market.joblist if not job.occupied())
+    assert vacant == set(job.ident for job in market.vacancies)
+    assert len(market.joblist.position) == len(market.joblist)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import sys
+sys.path.append('..')
+
+from intergen.population_store import MISSING
+
+
+@pytest.mark.parametrize("prod_type", ["experience", "exper-skill",
+                                       "difficulty", "logistic"])
+def test_vectorised_wages_match_per_job(prod_type, small_sim):
+    sim = small_sim(1000, 3, prod_type=prod_type)
+    market, pop = sim.labour_market, sim.pop
+    occupied = [job for job in market.joblist if job.occupant]
+    assert occupied
+    expected = [job.calc_wage(job.occupant, pop) for job in occupied]
+    market.update_wages(pop)
+    assert np.allclose([job.occupant.wage for job in occupied], expected)
+    assert market.employed_wages.min() == pytest.approx(min(expected))
+
+
+def test_table_follows_jobs(small_sim):
+    sim = small_sim(1000, 3, prod_type="difficulty")
+    market = sim.labour_market
+    table = market.job_table
+    assert len(table) == len(market.joblist)
+    for job in market.joblist:
+        assert table.agents[job._row] is job
+        expected = MISSING if job.occupant is None else job.occupant.agent.ident
+        assert table.occupant_id[job._row] == expected
+
+
+def test_churn_recycles_jobs(small_sim):
+    sim = small_sim(1000, 3, prod_type="difficulty")
+    market = sim.labour_market
+    num_jobs = len(market.joblist)
+    jobs = list(market.joblist)
+    market.churn_jobs(num_jobs // 2)
+    assert len(market.joblist) == num_jobs
+    assert len(market.job_table) == num_jobs
+    assert list(market.joblist) == jobs
+    for job in market.joblist:
+        if job.occupant is None:
+            assert job in market.vacancies
+            assert market.job_table.occupant_id[job._row] == MISSING
+        else:
+            assert job not in market.vacancies
+            assert job.occupant.job is job
+    assert len(market.vacancies) == sum(job.occupant is None
+                                        for job in market.joblist)
+    for agent in sim.pop.store.live_agents():
+        if agent.job_id != MISSING:
+            assert agent.employment.job.occupant is agent.employment
@@ -0,0 +1,127 @@
+import datetime
+import random as rnd
+
+import numpy as np
+import pytest
+
+import sys
+sys.path.append('..')
+
+from intergen.marriage_market import MarriageMarket
+from intergen.utils import calculate_age_years, year_from_ordinal
+
+
+class Clock(object):
+    def __init__(self, date):
+        self.date = date
+
+
+class Member(object):
+    def __init__(self, ident, clock):
+        self.ident = ident
+        self.dob = datetime.date(1900, 1, 1) + datetime.timedelta(
+            days=rnd.randint(0, 60 * 365))
+        self.DOB = self.dob.toordinal()
+        self.clock = clock
+        self.skill = rnd.random()
+
+    @property
+    def age_years(self):
+        return calculate_age_years(self.dob, self.clock.date)
+
+
+def distance(female, male):
+    age_diff = abs(male.age_years - female.age_years - 3)
+    return abs(male.skill - female.skill) + (age_diff ** 2) / 50
+
+
+def get_market(size, clock):
+    market = MarriageMarket(clock)
+    market.extend(Member(i, clock) for i in range(size))
+    return market
+
+
+def check_best_matches(market, clock, number):
+    for i in range(number):
+        female = Member(1000 + i, clock)
+        best = market.best_match(
+            female.skill, female.age_years + 3,
+            lambda age: (abs(age - female.age_years - 3) ** 2) / 50)
+        expected = min(distance(female, male) for male in market)
+        assert distance(female, best) == expected
+        market.remove(best)
+
+
+def test_best_match_is_best():
+    rnd.seed(3)
+    clock = Clock(datetime.date(1950, 6, 15))
+    market = get_market(500, clock)
+    check_best_matches(market, clock, 25)
+    buckets = market.buckets
+    # ages move on with the date, including part way through the year
+    clock.date = datetime.date(1951, 6, 15)
+    check_best_matches(market, clock, 25)
+    clock.date = datetime.date(1951, 11, 2)
+    check_best_matches(market, clock, 25)
+    assert len(market) == 425
+    # buckets are keyed by birth year, so are never rebuilt
+    assert market.buckets is buckets
+    assert all(year_from_ordinal(market.members[ident].DOB) == birth_year
+               for birth_year, bucket in buckets.items()
+               for _, ident in bucket)
+
+
+def test_remove_keeps_order_and_indexes():
+    rnd.seed(4)
+    clock = Clock(datetime.date(1950, 1, 1))
+    market = get_market(20, clock)
+    members = list(market)
+    for member in members[::2]:
+        market.remove(member)
+    assert list(market) == members[1::2]
+    assert sorted(market.slots, key=lambda m: m.ident) == members[1::2]
+    assert sum(len(bucket) for bucket in market.buckets.values()) == 10
+    assert members[0] not in market
+    assert members[1] in market
+    assert len(market.sample(50)) == 10
+
+
+def queued(pop):
+    return (list(pop.marriage_market_females) +
+            list(pop.marriage_market_males))
+
+
+@pytest.mark.parametrize("max_age", [None, 55])
+def test_membership_follows_lifecycle(max_age, small_population):
+    rnd.seed(1)
+    np.random.seed(1)
+    pop, timestepper = small_population(2000,
+                                        marriage_market_max_age=max_age)
+    # everyone eligible enters the market
+    pop.hazards.partnering_step = np.ones_like(pop.hazards.partnering_step)
+    pop.lifecycle_stage(timestepper)
+    members = queued(pop)
+    assert members
+    assert all(agent.in_marriage_market for agent in members)
+    assert all(agent.age_years > 16 for agent in members)
+    if max_age is None:
+        assert max(agent.age_years for agent in members) > 55
+    else:
+        assert all(agent.age_years <= max_age for agent in members)
+
+    dying = members[:10]
+    pop.remove_dead(dying)
+    assert not any(agent in queued(pop) for agent in dying)
+
+    ageing = queued(pop)[0]
+    ageing.age_years = 56 if max_age is None else max_age + 1
+    pop.lifecycle_stage(timestepper)
+    # only a set limit takes the old out of the market
+    assert (ageing in queued(pop)) == (max_age is None)
+    assert ageing.in_marriage_market == (max_age is None)
+
+    pop.resolve_marriage_market()
+    for agent in queued(pop):
+        assert not agent.have_partner()
+    assert sum(agent.in_marriage_market for agent in pop.poplist) == \
+        len(queued(pop))
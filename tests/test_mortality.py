@@ -0,0 +1,48 @@
+import random as rnd
+
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.utils import gompertz_hazard
+
+
+def test_gompertz_hazard_matches_closure(small_population):
+    pop, _ = small_population(10)
+    gompertz = pop.get_gompertz()
+    ages = np.arange(0, 110)
+    start = pop.params["gompertz_start"]
+    expected = [gompertz(age) if age > start else 0.0 for age in ages]
+    hazards = gompertz_hazard(ages, pop.params["gompertz_a"],
+                              pop.params["gompertz_b"],
+                              pop.params["gompertz_l"], start)
+    assert np.allclose(hazards, expected)
+
+
+def test_mortality_stage_agrees_with_reference(small_population):
+    """
+    Death counts from the vectorised stage and from Agent.check_survival
+    should both be consistent with the expected number of deaths.
+    """
+    rnd.seed(1)
+    np.random.seed(1)
+    pop, timestepper = small_population(20000)
+    mult = timestepper.get_timestep_days() / pop.params["year_length"]
+    probs = mult * gompertz_hazard(pop.store.column("age_years"),
+                                   pop.params["gompertz_a"],
+                                   pop.params["gompertz_b"],
+                                   pop.params["gompertz_l"],
+                                   pop.params["gompertz_start"])
+    expected = probs.sum()
+    sd = np.sqrt(np.sum(probs * (1 - probs)))
+
+    reference = sum(agent.check_survival() is not None
+                    for agent in pop.poplist)
+    vectorised = len(pop.mortality_stage(timestepper))
+
+    assert abs(reference - expected) < 4 * sd
+    assert abs(vectorised - expected) < 4 * sd
+    # nobody at or below the gompertz starting age dies
+    rows = pop.mortality_stage(timestepper)
+    assert np.all(pop.store.age_years[rows] > pop.params["gompertz_start"])
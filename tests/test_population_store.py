@@ -0,0 +1,54 @@
+import pytest
+
+import sys
+sys.path.append('..')
+
+from intergen.population_store import (PopulationStore, StoreView,
+                                       column_property, MISSING)
+
+
+class View(StoreView):
+    __slots__ = ()
+    ident = column_property("ident")
+    skill = column_property("skill")
+
+    def __init__(self, store, ident):
+        self.attach(store)
+        self.ident = ident
+        self.skill = ident / 10.0
+
+
+def test_append_and_defaults():
+    store = PopulationStore(capacity=2)
+    views = [View(store, i) for i in range(5)]
+    assert len(store) == 5
+    assert store.capacity >= 5
+    assert list(store.column("ident")) == list(range(5))
+    assert all(store.column("partner_id") == MISSING)
+    assert views[3].skill == 0.3
+
+
+def test_remove_keeps_views_consistent():
+    store = PopulationStore()
+    views = [View(store, i) for i in range(5)]
+    store.remove(views[1]._row)
+    assert len(store) == 4
+    assert sorted(store.column("ident")) == [0, 2, 3, 4]
+    for view in views[:1] + views[2:]:
+        assert store.agents[view._row] is view
+        assert store.ident[view._row] == view.ident
+
+
+def test_transfer_to_append_only_store():
+    store = PopulationStore()
+    dead = PopulationStore(keep_agents=False)
+    views = [View(store, i) for i in range(3)]
+    views[0].skill = 0.9
+    store.transfer(views[0]._row, dead)
+    assert len(store) == 2
+    assert len(dead) == 1
+    # the view still reads its values from the new store
+    assert views[0].skill == 0.9
+    assert views[0].ident == 0
+    with pytest.raises(ValueError):
+        dead.remove(0)
@@ -0,0 +1,74 @@
+from collections import Counter
+
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.agent import Agent, Female, Male
+from intergen.population_statistics_helpers import (get_age_distribution,
+                                                    get_cohort_unemployment,
+                                                    get_unemployment_rate,
+                                                    prop_married_by_age)
+from intergen.population_store import MISSING
+
+
+def test_histogram_matches_population(small_sim):
+    """
+    After births, deaths, partnering and job changes the incrementally
+    maintained counts should agree with a full recount.
+    """
+    sim = small_sim(2000, 5)
+    pop = sim.pop
+    store = pop.store
+    histogram = store.histogram
+    bins = histogram.bins(store.column("age_years"), store.column("female"),
+                          store.column("partner_id") != MISSING,
+                          store.column("job_id") != MISSING)
+    expected = np.bincount(bins, minlength=histogram.counts.size)
+    assert np.array_equal(histogram.counts.reshape(-1), expected)
+    assert histogram.counts.sum() == len(pop.poplist)
+
+    assert np.isclose(pop.derive_demand(),
+                      sum(agent.demand_contribution() for agent in pop.poplist))
+    assert pop.get_lab_force_size() == sum(
+        agent.employment.eligible_for_market() for agent in pop.poplist)
+
+
+def test_statistics_read_from_histogram(small_sim):
+    sim = small_sim(1000, 2)
+    pop = sim.pop
+    scan = get_age_distribution(pop, Female, condition=lambda agent: True)
+    assert get_age_distribution(pop, Female) == scan
+
+    employed = sum(agent.employment.have_job() for agent in pop.poplist)
+    workforce = sum(agent.employment.eligible_for_market()
+                    for agent in pop.poplist if isinstance(agent, Male))
+    assert np.isclose(get_unemployment_rate(pop), 1 - employed / workforce)
+
+    young = [agent for agent in pop.poplist if 16 < agent.age_years < 30]
+    employed = sum(agent.employment.have_job() for agent in young)
+    workforce = sum(agent.employment.eligible_for_market() for agent in young)
+    assert np.isclose(get_cohort_unemployment(pop, 16, 30, Male),
+                      1 - employed / workforce)
+
+    married = prop_married_by_age(pop, Female)
+    women_30 = [agent for agent in pop.poplist
+                if isinstance(agent, Female) and agent.age_years == 30]
+    assert np.isclose(married[30], sum(agent.have_partner()
+                                       for agent in women_30) / len(women_30))
+
+
+def test_age_distribution_keeps_unborn_and_oldest(small_sim):
+    sim = small_sim(1000, 2)
+    pop = sim.pop
+    oldest = max(pop.poplist, key=lambda agent: agent.age_years)
+    oldest.age_years = 125
+    unborn = min(pop.poplist, key=lambda agent: agent.age_years)
+    unborn.age_years = -1
+    for agent_type in (Female, Male, Agent):
+        scan = Counter(agent.age_years for agent in pop.poplist
+                       if isinstance(agent, agent_type))
+        assert get_age_distribution(pop, agent_type) == scan
+    assert get_age_distribution(pop, Agent)[125] == 1
+    assert get_age_distribution(pop, Agent)[-1] >= 1
@@ -60,3 +60,11 @@ def test_invalid_timestepper():
         get_timestepper("2016-0204", timestep="month")
     with pytest.raises(ValueError):
         get_timestepper("2016-02-04", timestep="blibble")
+
+
+def test_ordinal_follows_date():
+    timestepper = get_timestepper("2016-01-01", "month")
+    for _ in range(14):
+        assert timestepper.get_ordinal() == timestepper.date.toordinal()
+        timestepper.step_forward()
+    assert timestepper.start_ordinal == datetime.date(2016, 1, 1).toordinal()
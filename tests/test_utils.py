@@ -0,0 +1,32 @@
+import datetime
+import random as rnd
+
+import numpy as np
+
+import sys
+sys.path.append('..')
+
+from intergen.utils import (calculate_age_years, age_years_from_ordinals,
+                            years_from_ordinals)
+
+
+def test_age_years_from_ordinals_matches_dates():
+    rnd.seed(2)
+    start = datetime.date(1850, 1, 1)
+    dobs = [start + datetime.timedelta(days=rnd.randint(0, 40000))
+            for _ in range(2000)]
+    # include birthdays on leap days and on the day itself
+    dobs += [datetime.date(1904, 2, 29), datetime.date(1950, 3, 1)]
+    for today in [datetime.date(1961, 2, 28), datetime.date(1961, 3, 1),
+                  datetime.date(1964, 2, 29), datetime.date(1990, 12, 31)]:
+        ages = age_years_from_ordinals([dob.toordinal() for dob in dobs],
+                                       today)
+        expected = [calculate_age_years(dob, today) for dob in dobs]
+        assert list(ages) == expected
+
+
+def test_years_from_ordinals():
+    dates = [datetime.date(1899, 12, 31), datetime.date(1900, 1, 1),
+             datetime.date(2000, 2, 29)]
+    years = years_from_ordinals(np.array([d.toordinal() for d in dates]))
+    assert list(years) == [1899, 1900, 2000]